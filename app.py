@@ -3,15 +3,27 @@ Configuration-driven Flask application for reconciliation tool.
 All processing logic is now driven by configuration files.
 """
 
+import io
 import os
-import pandas as pd
+import secrets
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, render_template, request, send_file, jsonify
 from werkzeug.utils import secure_filename
 from config import ReconciliationConfig
-from processors import ReconciliationProcessor
-from rate_tool_integration import run_rate_analysis, save_uploaded_file
+
+# pandas, processors and the rates integration are imported lazily inside the
+# handlers that need them - /health and the type listing stay pandas-free and
+# cold start skips the heavy imports entirely
+
+# Make xlsxwriter optional - streams the export in bounded memory when available
+try:
+    import xlsxwriter  # noqa: F401
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    # Fall back to pandas' default openpyxl writer
+    XLSXWRITER_AVAILABLE = False
 
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = "uploads"
@@ -19,15 +31,30 @@ os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
 # Global instances
 config = ReconciliationConfig()
-processor = ReconciliationProcessor()
+processor = None  # built on first reconciliation request
 last_output = None
+last_xlsx_bytes = None  # lazily rendered export, cached across downloads
+
+# Per-result store so concurrent users don't race on one global;
+# each POST gets its own id and /download/<rid> serves only that result
+RESULTS = {}
+MAX_RESULTS = 32
+
+def get_processor():
+    """Create the shared ReconciliationProcessor on first use"""
+    global processor
+    if processor is None:
+        from processors import ReconciliationProcessor
+        processor = ReconciliationProcessor()
+    return processor
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     """Main route - handles both form display and processing"""
-    global last_output
+    global last_output, last_xlsx_bytes
     result = None
     error_message = None
+    download_url = None
     recon_type = request.form.get("recon_type")
 
     if request.method == "POST":
@@ -37,8 +64,23 @@ def index():
                 error_message = "Please select a valid reconciliation type."
             else:
                 # Process the reconciliation
-                result = processor.process(recon_type, request.files)
+                import pandas as pd
+
+                result = get_processor().process(recon_type, request.files)
                 last_output = pd.DataFrame(result) if result else None
+                last_xlsx_bytes = None  # invalidate; rendered on first download
+                if last_output is not None:
+                    # Status columns repeat a handful of values; store them as
+                    # integer-coded categories instead of N object pointers
+                    status_col = config.RESULT_TABLES.get(recon_type, {}).get("status_column")
+                    if status_col in last_output.columns:
+                        last_output[status_col] = last_output[status_col].astype("category")
+                if last_output is not None:
+                    rid = secrets.token_urlsafe(8)
+                    RESULTS[rid] = {"df": last_output, "xlsx": None}
+                    while len(RESULTS) > MAX_RESULTS:
+                        RESULTS.pop(next(iter(RESULTS)))
+                    download_url = f"/download/{rid}"
                 
         except Exception as e:
             error_message = f"Error processing files: {str(e)}"
@@ -50,6 +92,7 @@ def index():
                          result=result, 
                          recon_type=recon_type, 
                          error_message=error_message,
+                         download_url=download_url,
                          reconciliation_types=reconciliation_types,
                          result_config=config.RESULT_TABLES.get(recon_type, {}))
 
@@ -65,6 +108,8 @@ def rates_file():
     error_message = None
 
     if request.method == "POST":
+        from rate_tool_integration import run_rate_analysis, save_uploaded_file
+
         temp_dir = tempfile.mkdtemp(prefix="rates_tab_")
         try:
             summary_file = request.files.get("summary_file")
@@ -72,20 +117,22 @@ def rates_file():
                 raise ValueError("Summary file is required.")
 
             summary_path = save_uploaded_file(summary_file, temp_dir)
-            card_path = save_uploaded_file(request.files.get("card_file"), temp_dir)
-            international_path = save_uploaded_file(request.files.get("international_file"), temp_dir)
-            domestic_path = save_uploaded_file(request.files.get("domestic_file"), temp_dir)
-            dispute_path = save_uploaded_file(request.files.get("dispute_file"), temp_dir)
-            invoice_path = save_uploaded_file(request.files.get("invoice_file"), temp_dir)
-
-            file_paths = {
-                "summary": summary_path,
-                "card": card_path,
-                "international": international_path,
-                "domestic": domestic_path,
-                "dispute": dispute_path,
-                "invoice": invoice_path
+
+            # Write the optional uploads to disk concurrently
+            optional_fields = {
+                "card": "card_file",
+                "international": "international_file",
+                "domestic": "domestic_file",
+                "dispute": "dispute_file",
+                "invoice": "invoice_file"
             }
+            with ThreadPoolExecutor(max_workers=len(optional_fields)) as ex:
+                futures = {
+                    key: ex.submit(save_uploaded_file, request.files.get(field), temp_dir)
+                    for key, field in optional_fields.items()
+                }
+                file_paths = {key: fut.result() for key, fut in futures.items()}
+            file_paths["summary"] = summary_path
 
             report = run_rate_analysis(file_paths)
         except Exception as exc:
@@ -95,16 +142,42 @@ def rates_file():
 
     return render_template("rates_tab.html", report=report, error_message=error_message)
 
+def render_xlsx(df):
+    """Serialize a result frame to XLSX bytes without touching disk"""
+    buf = io.BytesIO()
+    if XLSXWRITER_AVAILABLE:
+        # constant_memory streams rows instead of building the full cell graph
+        df.to_excel(buf, index=False, engine="xlsxwriter",
+                    engine_kwargs={"options": {"constant_memory": True}})
+    else:
+        df.to_excel(buf, index=False)
+    return buf.getvalue()
+
 @app.route("/download")
 def download():
     """Download reconciliation results as Excel file"""
-    global last_output
+    global last_output, last_xlsx_bytes
     if last_output is not None:
-        path = "reconciliation_output.xlsx"
-        last_output.to_excel(path, index=False)
-        return send_file(path, as_attachment=True)
+        if last_xlsx_bytes is None:
+            # Serialize once; repeat downloads reuse the cached bytes
+            last_xlsx_bytes = render_xlsx(last_output)
+        return send_file(io.BytesIO(last_xlsx_bytes),
+                         as_attachment=True,
+                         download_name="reconciliation_output.xlsx")
     return "No reconciliation results available to download.", 404
 
+@app.route("/download/<rid>")
+def download_result(rid):
+    """Download a specific reconciliation result by its id"""
+    entry = RESULTS.get(rid)
+    if entry is None:
+        return "No reconciliation results available to download.", 404
+    if entry["xlsx"] is None:
+        entry["xlsx"] = render_xlsx(entry["df"])
+    return send_file(io.BytesIO(entry["xlsx"]),
+                     as_attachment=True,
+                     download_name="reconciliation_output.xlsx")
+
 @app.route("/health")
 def health_check():
     """Health check endpoint"""
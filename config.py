@@ -113,6 +113,20 @@ class ReconciliationConfig:
         }
     }
     
+    # Canonical target names keyed by their cleaned form - lets column
+    # normalization map already-canonical headers with one dict lookup
+    TARGETS_BY_CLEAN = {
+        mapping["target"].lower().replace(" ", "").replace("_", ""): mapping["target"]
+        for mapping in COLUMN_MAPPINGS.values()
+    }
+
+    # Compiled alternation per column type - one C-level regex match per column
+    # instead of a Python substring loop over every pattern
+    COMPILED_COLUMN_PATTERNS = {
+        col_type: re.compile("|".join(re.escape(p) for p in mapping["patterns"]))
+        for col_type, mapping in COLUMN_MAPPINGS.items()
+    }
+
     # Text parsing patterns for different file formats
     TEXT_PATTERNS = {
         "visa_settlement": {
@@ -123,6 +137,25 @@ class ReconciliationConfig:
         }
     }
     
+    # Precompiled text patterns (compiled once at class load, reused on every request)
+    COMPILED_TEXT_PATTERNS = {
+        pattern_set: {
+            field_name: re.compile(pattern, re.IGNORECASE)
+            for field_name, pattern in patterns.items()
+        }
+        for pattern_set, patterns in TEXT_PATTERNS.items()
+    }
+
+    # Bytes variants of the compiled patterns, for matching mmap/bytes buffers
+    # without decoding whole files first
+    COMPILED_TEXT_PATTERNS_BYTES = {
+        pattern_set: {
+            field_name: re.compile(pattern.encode("latin1"), re.IGNORECASE)
+            for field_name, pattern in patterns.items()
+        }
+        for pattern_set, patterns in TEXT_PATTERNS.items()
+    }
+
     # Section name mappings for reconciliation
     SECTION_MAPPINGS = {
         "INTERCHANGE": "Interchange",
@@ -149,7 +182,9 @@ class ReconciliationConfig:
         "max_file_size": 50 * 1024 * 1024,  # 50MB
         "supported_encodings": ["utf-8", "latin1", "cp1252"],
         "excel_extensions": [".xlsx", ".xls"],
-        "text_extensions": [".txt", ".csv"]
+        "text_extensions": [".txt", ".csv"],
+        "excel_cache_dir": ".cache",
+        "excel_engine": "calamine"
     }
     
     # Result table configurations
@@ -187,6 +222,16 @@ class ReconciliationConfig:
     def get_text_patterns(cls, pattern_set: str) -> Dict[str, str]:
         """Get text parsing patterns for a specific format"""
         return cls.TEXT_PATTERNS.get(pattern_set, {})
+
+    @classmethod
+    def get_compiled_text_patterns(cls, pattern_set: str) -> Dict[str, Any]:
+        """Get precompiled text parsing patterns for a specific format"""
+        return cls.COMPILED_TEXT_PATTERNS.get(pattern_set, {})
+
+    @classmethod
+    def get_compiled_text_patterns_bytes(cls, pattern_set: str) -> Dict[str, Any]:
+        """Get precompiled bytes text parsing patterns for a specific format"""
+        return cls.COMPILED_TEXT_PATTERNS_BYTES.get(pattern_set, {})
     
     @classmethod
     def validate_reconciliation_type(cls, recon_type: str) -> bool:
@@ -4,85 +4,254 @@ Each processor handles a specific reconciliation workflow.
 """
 
 import os
-import re
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Tuple
 from config import ReconciliationConfig
-from reconcile import extract_values, extract_from_txt, reconcile
+from reconcile import extract_values, extract_from_txt_text, reconcile
+
+# Make hyperscan optional - single-pass multi-pattern scanning when available
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    # Fall back to per-pattern re scanning
+    HYPERSCAN_AVAILABLE = False
+
+# Make the Rust-based calamine Excel engine optional
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    # Fall back to pandas' default engine
+    CALAMINE_AVAILABLE = False
 
 class ReconciliationProcessor:
     """Base class for all reconciliation processors"""
-    
+
+    # Per-pattern-set field specs (display name + compiled regex), built once and shared
+    _TEXT_FIELD_SPECS = {}
+
+    # Compiled hyperscan databases keyed by pattern set (only populated when available)
+    _HS_DATABASES = {}
+
     def __init__(self):
         self.config = ReconciliationConfig()
     
     def normalize_columns(self, df: pd.DataFrame, context: str = "general") -> pd.DataFrame:
         """Dynamically normalize column names based on configuration"""
         col_map = {}
-        
-        for col in df.columns:
-            clean_col = str(col).strip().lower().replace(" ", "").replace("_", "")
-            
-            # Check each column mapping pattern
-            for col_type, mapping in self.config.COLUMN_MAPPINGS.items():
-                if any(pattern in clean_col for pattern in mapping["patterns"]):
-                    col_map[col] = mapping["target"]
+
+        # Clean all names in one vectorized pass instead of per-column chains
+        cols = np.asarray([str(c) for c in df.columns], dtype=str)
+        clean = np.char.replace(
+            np.char.replace(np.char.lower(np.char.strip(cols)), " ", ""), "_", "")
+
+        for col, clean_col in zip(df.columns, clean):
+            # Already-canonical names short-circuit with a dict lookup
+            target = self.config.TARGETS_BY_CLEAN.get(clean_col)
+            if target is not None:
+                col_map[col] = target
+                continue
+
+            # Check each compiled column pattern
+            for col_type, regex in self.config.COMPILED_COLUMN_PATTERNS.items():
+                if regex.search(clean_col):
+                    col_map[col] = self.config.COLUMN_MAPPINGS[col_type]["target"]
                     break
-        
+
         return df.rename(columns=col_map)
     
     def load_excel_with_autodetect(self, filepath: str, detection_type: str = "transaction_excel") -> pd.DataFrame:
         """Auto-detect header row based on configuration patterns"""
-        df_raw = pd.read_excel(filepath, header=None)
-        header_row = None
-        
+        # Re-uploads of the same bytes skip the Excel parse entirely
+        cache_path = self._excel_cache_path(filepath, detection_type)
+        if cache_path is not None and os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+
+        df_raw = self._read_excel(filepath, header=None)
+
         detection_patterns = self.config.HEADER_DETECTION.get(detection_type, [])
-        
-        for i, row in df_raw.iterrows():
-            row_values = row.astype(str).str.strip().str.lower().tolist()
-            if all(any(pattern in val for val in row_values) for pattern in detection_patterns):
-                header_row = i
-                break
-        
-        if header_row is None:
+
+        # One C-level pass over the whole frame instead of per-row iteration
+        lower = np.char.lower(np.char.strip(df_raw.to_numpy(dtype=str)))
+        row_matches = np.ones(lower.shape[0], dtype=bool)
+        for pattern in detection_patterns:
+            row_matches &= (np.char.find(lower, pattern) >= 0).any(axis=1)
+
+        if not row_matches.any():
             raise ValueError(f"Could not detect header in {filepath} using patterns: {detection_patterns}")
-        
-        return pd.read_excel(filepath, header=header_row)
+
+        header_row = int(np.argmax(row_matches))
+
+        # Slice the already-parsed frame instead of reading the file a second time
+        df = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+        names = [str(c).strip() for c in df_raw.iloc[header_row].tolist()]
+        # pd.read_excel(header=n) mangles repeated headers to "X.1", "X.2",
+        # ...; mirror that so label selections stay Series-valued
+        seen = {}
+        for i, name in enumerate(names):
+            n = seen.get(name, 0)
+            seen[name] = n + 1
+            if n:
+                names[i] = f"{name}.{n}"
+        df.columns = names
+
+        # The header=None read leaves most columns as object; restore numeric
+        # dtypes. Only object and string columns qualify - to_numeric would
+        # turn an already-typed datetime column into epoch ints
+        for i in range(df.shape[1]):
+            col = df.iloc[:, i]
+            if col.dtype != object and not pd.api.types.is_string_dtype(col):
+                continue
+            converted = pd.to_numeric(col, errors="coerce")
+            if converted.notna().equals(col.notna()):
+                df.isetitem(i, converted)
+
+        if cache_path is not None:
+            try:
+                df.to_pickle(cache_path)
+            except OSError:
+                pass
+
+        return df
+
+    def _read_excel(self, filepath, **kwargs) -> pd.DataFrame:
+        """pd.read_excel with the configured engine, falling back to the default"""
+        engine = self.config.FILE_SETTINGS.get("excel_engine")
+        if engine == "calamine" and not CALAMINE_AVAILABLE:
+            engine = None
+        if engine:
+            kwargs["engine"] = engine
+        return pd.read_excel(filepath, **kwargs)
+
+    def _excel_cache_path(self, filepath, detection_type: str):
+        """Content-hash cache location for the post-header frame of an upload
+
+        Accepts a path or a seekable stream - the processors hand uploads
+        through as file.stream, so the stream branch is the one the web app
+        actually hits. The stream is rewound after hashing so the Excel read
+        that follows sees the full file.
+        """
+        try:
+            if isinstance(filepath, str):
+                with open(filepath, "rb") as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+            elif hasattr(filepath, "read") and hasattr(filepath, "seek"):
+                filepath.seek(0)
+                digest = hashlib.sha1(filepath.read()).hexdigest()
+                filepath.seek(0)
+            else:
+                return None
+        except (OSError, ValueError):
+            return None
+        cache_dir = self.config.FILE_SETTINGS["excel_cache_dir"]
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, f"{digest}_{detection_type}.pkl")
     
     def extract_from_text(self, filepath: str, pattern_set: str = "visa_settlement") -> Dict[str, Any]:
         """Extract data from text file using configurable patterns"""
-        # Try different encodings
-        text = None
-        for encoding in self.config.FILE_SETTINGS["supported_encodings"]:
+        # mmap the file so matching runs against the OS page cache with no
+        # full-file str allocation; only captured groups get decoded
+        with open(filepath, "rb") as f:
             try:
-                with open(filepath, "r", encoding=encoding) as f:
-                    text = f.read()
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if text is None:
-            raise ValueError(f"Could not read file {filepath} with any supported encoding")
-        
-        patterns = self.config.get_text_patterns(pattern_set)
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return self._extract_fields(b"", pattern_set)
+            with mm:
+                return self._extract_fields(mm, pattern_set)
+
+    def _extract_fields(self, data, pattern_set: str) -> Dict[str, Any]:
+        """Run the configured patterns over a bytes buffer (bytes or mmap)"""
+        candidates = None
+        if HYPERSCAN_AVAILABLE:
+            candidates = self._hyperscan_candidates(data, pattern_set)
+
         extracted_data = {}
-        
-        for field_name, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
+
+        for match_id, (field_name, display_name, regex) in enumerate(self._text_field_specs(pattern_set)):
+            if candidates is None:
+                match = regex.search(data)
+            else:
+                span = candidates.get(match_id)
+                match = regex.search(span) if span is not None else None
             if match:
-                value = match.group(1)
+                # latin1 maps every byte, so decoding the capture never raises
+                value = match.group(1).decode("latin1")
                 # Process based on field type
                 if "count" in field_name:
-                    extracted_data[self._format_field_name(field_name)] = int(value)
+                    extracted_data[display_name] = int(value)
                 elif "amount" in field_name or "credit" in field_name:
-                    extracted_data[self._format_field_name(field_name)] = float(value.replace(",", ""))
+                    extracted_data[display_name] = float(value.replace(",", ""))
                 else:
-                    extracted_data[self._format_field_name(field_name)] = value
+                    extracted_data[display_name] = value
             else:
-                extracted_data[self._format_field_name(field_name)] = None
-        
+                extracted_data[display_name] = None
+
         return extracted_data
-    
+
+    def _hyperscan_candidates(self, data, pattern_set: str) -> Dict[int, bytes]:
+        """Scan the whole buffer once with hyperscan; return matched slices keyed by pattern id"""
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        spans = {}
+
+        def on_match(match_id, start, end, flags, context):
+            if match_id not in spans:
+                spans[match_id] = (start, end)
+
+        self._hyperscan_db(pattern_set).scan(data, match_event_handler=on_match)
+
+        return {
+            match_id: data[start:end]
+            for match_id, (start, end) in spans.items()
+        }
+
+    def _hyperscan_db(self, pattern_set: str):
+        """Build (once) a hyperscan database covering all patterns of a set"""
+        db = self._HS_DATABASES.get(pattern_set)
+        if db is None:
+            specs = self._text_field_specs(pattern_set)
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[regex.pattern for _, _, regex in specs],
+                ids=list(range(len(specs))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(specs)
+            )
+            self._HS_DATABASES[pattern_set] = db
+        return db
+
+    def _text_field_specs(self, pattern_set: str) -> Tuple:
+        """Get (field_name, display_name, compiled_pattern) tuples for a pattern set"""
+        specs = self._TEXT_FIELD_SPECS.get(pattern_set)
+        if specs is None:
+            compiled = self.config.get_compiled_text_patterns_bytes(pattern_set)
+            specs = tuple(
+                (field_name, self._format_field_name(field_name), regex)
+                for field_name, regex in compiled.items()
+            )
+            self._TEXT_FIELD_SPECS[pattern_set] = specs
+        return specs
+
+    def _drop_blank_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """dropna(how="all") that returns the frame untouched when it has no NaNs"""
+        na = df.isna().values
+        if not na.any():
+            return df
+        return df.iloc[~na.all(axis=1)]
+
+    def _numeric_id_mask(self, col: pd.Series) -> np.ndarray:
+        """Boolean mask of rows whose value looks numeric, without a float parse per cell"""
+        if pd.api.types.is_numeric_dtype(col):
+            return col.notna().to_numpy()
+        vals = np.char.strip(col.to_numpy(dtype=str))
+        # Digit test covers plain ids and Excel-style floats like "123.0"
+        return np.char.isdigit(np.char.replace(vals, ".", ""))
+
     def _format_field_name(self, field_name: str) -> str:
         """Convert field names to display format"""
         return " ".join(word.capitalize() for word in field_name.split("_"))
@@ -130,143 +299,122 @@ class ReconciliationProcessor:
         """Process Bank Statement vs VISA Settlement reconciliation"""
         excel_file = files["excel_file"]
         txt_file = files["txt_file_bank"]
-        
-        # Save files temporarily
-        excel_path = f"temp_{excel_file.filename}"
-        txt_path = f"temp_{txt_file.filename}"
-        
-        excel_file.save(excel_path)
-        txt_file.save(txt_path)
-        
-        try:
-            # Use existing functions but with validation
-            bank_data = extract_values(excel_path)
-            visa_data = extract_from_txt(txt_path)
-            df = reconcile(bank_data, visa_data)
-            
-            return df.to_dict(orient="records")
-        finally:
-            # Cleanup temp files
-            if os.path.exists(excel_path):
-                os.remove(excel_path)
-            if os.path.exists(txt_path):
-                os.remove(txt_path)
+
+        # Parse straight from the upload streams - no temp files on disk
+        bank_data = extract_values(excel_file.stream)
+        text = txt_file.stream.read().decode("utf-8", errors="replace")
+        visa_data = extract_from_txt_text(text)
+        df = reconcile(bank_data, visa_data)
+
+        # Stream rows out as plain dicts - avoids the block-wise copy
+        # that to_dict(orient="records") makes for wide frames
+        cols = df.columns.tolist()
+        return [dict(zip(cols, row)) for row in df.itertuples(index=False, name=None)]
     
     def process_visa_vs_summary(self, files: Dict[str, Any]) -> List[Dict]:
         """Process VISA Detailed vs Summary Report reconciliation"""
         visa_file = files["visa_file"]
         txt_file = files["txt_file_summary"]
-        
-        # Save files temporarily
-        visa_path = f"temp_{visa_file.filename}"
-        txt_path = f"temp_{txt_file.filename}"
-        
-        visa_file.save(visa_path)
-        txt_file.save(txt_path)
-        
-        try:
-            # Extract data using dynamic methods
-            txt_data = self.extract_from_text(txt_path, "visa_settlement")
-            
-            # Load and process VISA Excel file
-            df = self.load_excel_with_autodetect(visa_path, "transaction_excel")
-            df = self.normalize_columns(df, "visa")
-            df = df.dropna(how="all")
-            
-            # Filter valid transactions
-            if "Transaction ID" in df.columns:
-                df = df[pd.to_numeric(df["Transaction ID"], errors="coerce").notnull()]
-            
-            # Calculate summary from detailed data
-            visa_summary = {
-                "Report Date": "N/A (from Excel)",
-                "Transaction Count": df.shape[0],
-                "Debit Amount": df["Amount"].sum() if "Amount" in df.columns else 0,
-                "Fee Credit": df["Interchange"].sum() if "Interchange" in df.columns else 0
-            }
-            
-            # Compare summaries
-            checks = []
-            for key in txt_data:
-                val1 = visa_summary.get(key, "N/A")
-                val2 = txt_data[key]
-                status = "Match" if val1 == val2 else "Mismatch"
-                checks.append({
-                    "Check": key,
-                    "Detailed Report": str(val1),
-                    "Summary Report": str(val2),
-                    "Status": status
-                })
-            
-            return checks
-        finally:
-            # Cleanup temp files
-            if os.path.exists(visa_path):
-                os.remove(visa_path)
-            if os.path.exists(txt_path):
-                os.remove(txt_path)
+
+        # Parse straight from the upload streams - no temp files on disk
+        txt_data = self._extract_fields(txt_file.stream.read(), "visa_settlement")
+
+        # Load and process VISA Excel file
+        df = self.load_excel_with_autodetect(visa_file.stream, "transaction_excel")
+        df = self.normalize_columns(df, "visa")
+        df = self._drop_blank_rows(df)
+
+        # Filter valid transactions
+        if "Transaction ID" in df.columns:
+            df = df[self._numeric_id_mask(df["Transaction ID"])]
+
+        # Calculate summary from detailed data; coerce once and reduce in
+        # NumPy rather than through pandas' per-sum dispatch
+        def _column_sum(name):
+            if name not in df.columns:
+                return 0
+            return np.nansum(pd.to_numeric(df[name], errors="coerce").to_numpy())
+
+        visa_summary = {
+            "Report Date": "N/A (from Excel)",
+            "Transaction Count": df.shape[0],
+            "Debit Amount": _column_sum("Amount"),
+            "Fee Credit": _column_sum("Interchange")
+        }
+
+        # Compare summaries
+        checks = []
+        for key in txt_data:
+            val1 = visa_summary.get(key, "N/A")
+            val2 = txt_data[key]
+            status = "Match" if val1 == val2 else "Mismatch"
+            checks.append({
+                "Check": key,
+                "Detailed Report": str(val1),
+                "Summary Report": str(val2),
+                "Status": status
+            })
+
+        return checks
     
     def process_cms_vs_visa(self, files: Dict[str, Any]) -> List[Dict]:
         """Process CMS vs VISA Comparison reconciliation"""
         cms_file = files["cms_file"]
         visa_file = files["visa_file_cms"]
-        
-        # Save files temporarily
-        cms_path = f"temp_{cms_file.filename}"
-        visa_path = f"temp_{visa_file.filename}"
-        
-        cms_file.save(cms_path)
-        visa_file.save(visa_path)
-        
-        try:
-            # Load both files with auto-detection
-            cms_df = self.load_excel_with_autodetect(cms_path, "transaction_excel")
-            visa_df = self.load_excel_with_autodetect(visa_path, "transaction_excel")
-            
-            # Normalize columns
-            cms_df = self.normalize_columns(cms_df, "cms")
-            visa_df = self.normalize_columns(visa_df, "visa")
-            
-            # Clean data
-            cms_df = cms_df.dropna(how="all")
-            visa_df = visa_df.dropna(how="all")
-            
-            # Filter valid transactions
-            required_cols = ["Transaction ID", "RRN No"]
-            cms_cols = [col for col in required_cols if col in cms_df.columns]
-            visa_cols = [col for col in required_cols if col in visa_df.columns]
-            
-            if not cms_cols or not visa_cols:
-                raise ValueError("Required columns (Transaction ID, RRN No) not found in files")
-            
-            # Filter numeric transaction IDs
-            if "Transaction ID" in cms_df.columns:
-                cms_df = cms_df[pd.to_numeric(cms_df["Transaction ID"], errors="coerce").notnull()]
-            if "Transaction ID" in visa_df.columns:
-                visa_df = visa_df[pd.to_numeric(visa_df["Transaction ID"], errors="coerce").notnull()]
-            
-            # Merge and compare
-            merged = pd.merge(
-                cms_df[cms_cols],
-                visa_df[visa_cols],
-                on=cms_cols,
-                how="outer",
-                indicator=True
-            )
-            
-            merged["Match Status"] = merged["_merge"].map({
-                "both": "Match",
-                "left_only": "Missing in VISA",
-                "right_only": "Missing in CMS"
-            })
-            
-            result_cols = cms_cols + ["Match Status"]
-            merged = merged[result_cols]
-            
-            return merged.astype(str).to_dict(orient="records")
-        finally:
-            # Cleanup temp files
-            if os.path.exists(cms_path):
-                os.remove(cms_path)
-            if os.path.exists(visa_path):
-                os.remove(visa_path)
\ No newline at end of file
+
+        # Load both upload streams with auto-detection - no temp files on disk.
+        # The parses run concurrently; the Excel engines spend most of their
+        # time in IO and C parsing where the GIL is released
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_cms = ex.submit(self.load_excel_with_autodetect, cms_file.stream, "transaction_excel")
+            fut_visa = ex.submit(self.load_excel_with_autodetect, visa_file.stream, "transaction_excel")
+            cms_df = fut_cms.result()
+            visa_df = fut_visa.result()
+
+        # Normalize columns
+        cms_df = self.normalize_columns(cms_df, "cms")
+        visa_df = self.normalize_columns(visa_df, "visa")
+
+        # Clean data
+        cms_df = self._drop_blank_rows(cms_df)
+        visa_df = self._drop_blank_rows(visa_df)
+
+        # Filter valid transactions
+        required_cols = ["Transaction ID", "RRN No"]
+        cms_cols = [col for col in required_cols if col in cms_df.columns]
+        visa_cols = [col for col in required_cols if col in visa_df.columns]
+
+        if not cms_cols or not visa_cols:
+            raise ValueError("Required columns (Transaction ID, RRN No) not found in files")
+
+        # Filter numeric transaction IDs
+        if "Transaction ID" in cms_df.columns:
+            cms_df = cms_df[self._numeric_id_mask(cms_df["Transaction ID"])]
+        if "Transaction ID" in visa_df.columns:
+            visa_df = visa_df[self._numeric_id_mask(visa_df["Transaction ID"])]
+
+        # Hash-join via pandas indexes - the membership test runs in C over
+        # whole columns instead of hashing per-row Python tuples
+        if len(cms_cols) > 1:
+            cms_idx = pd.MultiIndex.from_frame(cms_df[cms_cols])
+            visa_idx = pd.MultiIndex.from_frame(visa_df[cms_cols])
+        else:
+            cms_idx = pd.Index(cms_df[cms_cols[0]])
+            visa_idx = pd.Index(visa_df[cms_cols[0]])
+
+        cms_status = np.where(cms_idx.isin(visa_idx), "Match", "Missing in VISA")
+        visa_only = ~visa_idx.isin(cms_idx)
+
+        records = []
+        for key, status in zip(cms_idx, cms_status):
+            key = key if isinstance(key, tuple) else (key,)
+            record = {col: str(val) for col, val in zip(cms_cols, key)}
+            record["Match Status"] = status
+            records.append(record)
+        for key in visa_idx[visa_only]:
+            key = key if isinstance(key, tuple) else (key,)
+            record = {col: str(val) for col, val in zip(cms_cols, key)}
+            record["Match Status"] = "Missing in CMS"
+            records.append(record)
+
+        return records
\ No newline at end of file
@@ -5,11 +5,99 @@ Completely dynamic - no hardcoded values.
 """
 
 import pandas as pd
+import numpy as np
 import sys
 import os
+import atexit
+from collections import namedtuple
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from tabulate import tabulate
 import re
 
+# Single-pass "looks like a number" test for scalar cells - replaces the
+# replace(',','').replace('.','').isdigit() chains and their intermediate
+# string allocations
+_NUMLIKE_RE = re.compile(r'\d[\d,]*(?:\.\d*)?$')
+_is_numlike = _NUMLIKE_RE.match
+
+# Precompiled rate-formula patterns shared by the calculate_* helpers
+_NUM_RE = re.compile(r'(\d+(?:\.\d+)?)')
+_THRESHOLD_RE = re.compile(r'(\d+)[kK]')
+_RATE_STAR_RE = re.compile(r'\*\s*(?:Rs|rs|\$)?(\d+(?:\.\d+)?)')
+
+# Keyword alternations compiled once for scalar checks, plus the shared
+# keyword tuples used to build cell-array masks
+_FEE_RE = re.compile(r'fee|charge|cost|type|service|transaction', re.I)
+_RATE_RE = re.compile(r'rate|amount|price|cost|chart|value', re.I)
+_TOTAL_KEYWORDS = ('total', 'total cards', 'cards issued', 'quarter')
+_PERIOD_KEYWORDS = ('apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec', 'period', 'month')
+_DISPUTE_KEYWORDS = ('no of disputed', 'number of disputed', 'disputed transactions')
+# Above this many rows the boxed grid table format gets expensive to draw;
+# switch to the lighter simple format
+_GRID_ROW_LIMIT = 500
+
+# Keywords for transaction totals - enhanced for better detection
+_TOTAL_AMOUNT_KEYWORDS = ('total', 'sum', 'grand total', 'total of', 'total amount')
+_VOLUME_KEYWORDS = ('volume', 'count', 'number', 'transactions', 'volume of',
+                    'no of', 'disputed transactions')
+# The three per-file transaction buckets, in reporting order
+_TRANSACTION_TYPES = ('international', 'domestic', 'disputes')
+# Pre-lowered header strings skipped when harvesting fee/rate cell pairs;
+# values are stripped before comparison so no trailing-space variants needed
+_HEADER_FEE = frozenset({'fee type', 'type', 's.no.', 'sno', 'sr.no'})
+_HEADER_RATE = frozenset({'rate', 'amount', 'chart', 'rates chart'})
+
+def _contains_any(str_lo, keywords):
+    """Boolean mask of cells containing any of the given lowercase keywords"""
+    mask = np.zeros(str_lo.shape, dtype=bool)
+    for keyword in keywords:
+        mask |= np.char.find(str_lo, keyword) >= 0
+    return mask
+
+def _as_int(value):
+    """Parse whole numbers that may arrive as floats or comma-grouped strings
+
+    Returns the int, or None when the value is not a whole number. Covers the
+    "1,234" and 1234.0 shapes openpyxl commonly produces, which a plain
+    str.isdigit() check rejects. Dates, booleans and other cell types that
+    merely coerce to an integer are rejected outright, as are negatives -
+    every caller is parsing a count, which isdigit() could never read as
+    negative either.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, np.integer)):
+        return None
+    if isinstance(value, str):
+        value = value.replace(',', '')
+    num = pd.to_numeric(value, errors='coerce')
+    if pd.notna(num) and num >= 0 and float(num).is_integer():
+        return int(num)
+    return None
+
+# Precomputed views share the stringified cell arrays across all the sheet
+# analyzers instead of each one re-stringifying the same DataFrame
+SheetView = namedtuple('SheetView', 'df strs str_lo notna')
+
+def _make_view(df):
+    """Build a SheetView with stripped/lowered cell arrays computed once"""
+    if df.size == 0:
+        empty = np.empty(df.shape, dtype='<U1')
+        return SheetView(df, empty, empty, df.notna().to_numpy())
+    strs = np.char.strip(df.to_numpy(dtype=str))
+    return SheetView(df, strs, np.char.lower(strs), df.notna().to_numpy())
+
+def _as_view(obj):
+    """Accept either a DataFrame or an already-built SheetView"""
+    return obj if isinstance(obj, SheetView) else _make_view(obj)
+
+@dataclass(slots=True)
+class Bucket:
+    """Totals for one transaction type - slots keep the per-bucket attribute
+    reads at fixed offsets instead of dict hash lookups"""
+    total_amount: float = 0
+    total_volume: int = 0
+    transactions: list = field(default_factory=list)
+
 # Make tkinter optional for server deployment
 try:
     import tkinter as tk
@@ -19,6 +107,24 @@ except ImportError:
     # Running on server without GUI support
     TKINTER_AVAILABLE = False
 
+# Hidden Tk root shared by the file dialogs - Tk/Tcl bootstrap is expensive,
+# so create it once per session instead of per select_file call
+_TK_ROOT = None
+
+def _get_tk_root():
+    """Return the cached hidden Tk root, creating it on first use"""
+    global _TK_ROOT
+    if _TK_ROOT is None:
+        _TK_ROOT = tk.Tk()
+        _TK_ROOT.withdraw()
+        _TK_ROOT.attributes('-topmost', True)
+        atexit.register(_destroy_tk_root)
+    return _TK_ROOT
+
+def _destroy_tk_root():
+    if _TK_ROOT is not None:
+        _TK_ROOT.destroy()
+
 def select_file(title="Select Excel File"):
     """
     Open file dialog to select Excel file
@@ -33,13 +139,11 @@ def select_file(title="Select Excel File"):
         # Running on server - tkinter not available
         return None
 
-    # Create a root window but hide it
-    root = tk.Tk()
-    root.withdraw()
-    root.attributes('-topmost', True)
+    root = _get_tk_root()
 
     # Open file dialog
     file_path = filedialog.askopenfilename(
+        parent=root,
         title=title,
         filetypes=[
             ("Excel files", "*.xlsx *.xls"),
@@ -47,9 +151,6 @@ def select_file(title="Select Excel File"):
         ]
     )
 
-    # Destroy the root window
-    root.destroy()
-
     return file_path if file_path else None
 
 def select_multiple_files():
@@ -128,6 +229,55 @@ def select_multiple_files():
 
     return files
 
+def _fast_read_sheets(file_path):
+    """
+    Yield (sheet_name, DataFrame) pairs using openpyxl's read-only mode
+
+    Read-only workbooks stream cell values without building style objects,
+    keeping memory flat on large sheets. Legacy .xls files fall back to the
+    pandas loader.
+    """
+    if str(file_path).lower().endswith('.xls'):
+        with pd.ExcelFile(file_path) as xl_file:
+            yield from pd.read_excel(xl_file, sheet_name=None).items()
+        return
+
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                yield ws.title, pd.DataFrame()
+                continue
+            columns = [f"Unnamed: {i}" if v is None else v for i, v in enumerate(header)]
+            # pd.read_excel mangles repeated headers to "Amount.1", "Amount.2",
+            # ...; mirror that so label lookups like columns.get_loc stay scalar
+            seen = {}
+            for i, name in enumerate(columns):
+                n = seen.get(name, 0)
+                seen[name] = n + 1
+                if n:
+                    columns[i] = f"{name}.{n}"
+            df = pd.DataFrame(rows, columns=columns)
+            # Raw cell values skip read_excel's type inference, which would
+            # leave text-formatted numbers as strings and misroute them in the
+            # dtype-based cell dispatch; restore numeric dtypes the same way
+            # processors.load_excel_with_autodetect does. Only object and
+            # string columns qualify - to_numeric would turn datetime64
+            # columns into epoch ints
+            for i in range(df.shape[1]):
+                col = df.iloc[:, i]
+                if col.dtype != object and not pd.api.types.is_string_dtype(col):
+                    continue
+                converted = pd.to_numeric(col, errors="coerce")
+                if converted.notna().equals(col.notna()):
+                    df.isetitem(i, converted)
+            yield ws.title, df
+    finally:
+        wb.close()
+
 def analyze_excel_structure(file_path):
     """
     Dynamically analyze Excel file structure to find fee types and rates
@@ -139,27 +289,27 @@ def analyze_excel_structure(file_path):
         dict: Structure analysis results
     """
     try:
-        # Read Excel file
-        xl_file = pd.ExcelFile(file_path)
-        sheets = xl_file.sheet_names
-
-        analysis_results = {
-            'file_path': file_path,
-            'sheets': sheets,
-            'mappings': {}
-        }
-
-        print(f"\nAnalyzing file: {os.path.basename(file_path)}")
-        print(f"Found {len(sheets)} sheet(s): {', '.join(sheets)}")
+        # Stream sheets in this thread while worker threads analyze them -
+        # workbook parsing overlaps with the per-sheet analysis
+        with ThreadPoolExecutor() as ex:
+            futures = [(sheet_name, ex.submit(analyze_sheet_for_fee_mapping, df, sheet_name))
+                       for sheet_name, df in _fast_read_sheets(file_path)]
+
+            sheets = [sheet_name for sheet_name, _ in futures]
+            analysis_results = {
+                'file_path': file_path,
+                'sheets': sheets,
+                'mappings': {}
+            }
 
-        # Analyze each sheet
-        for sheet_name in sheets:
-            print(f"\nAnalyzing sheet: '{sheet_name}'")
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            print(f"\nAnalyzing file: {os.path.basename(file_path)}")
+            print(f"Found {len(sheets)} sheet(s): {', '.join(sheets)}")
 
-            sheet_analysis = analyze_sheet_for_fee_mapping(df, sheet_name)
-            if sheet_analysis['mappings']:
-                analysis_results['mappings'][sheet_name] = sheet_analysis
+            # Collect results in sheet order
+            for sheet_name, future in futures:
+                sheet_analysis = future.result()
+                if sheet_analysis['mappings']:
+                    analysis_results['mappings'][sheet_name] = sheet_analysis
 
         return analysis_results
 
@@ -178,6 +328,11 @@ def analyze_sheet_for_fee_mapping(df, sheet_name):
     Returns:
         dict: Analysis results for the sheet
     """
+    # Build the string view once; every mapping strategy below reuses the
+    # same stripped/lowered cell arrays instead of re-deriving them
+    view = _as_view(df)
+    df = view.df
+
     result = {
         'sheet_name': sheet_name,
         'shape': df.shape,
@@ -189,7 +344,7 @@ def analyze_sheet_for_fee_mapping(df, sheet_name):
     print(f"   Columns: {len(df.columns)}")
 
     # Look for potential fee type and rate columns
-    fee_mappings = find_fee_rate_pairs(df)
+    fee_mappings = find_fee_rate_pairs(view)
 
     if fee_mappings:
         result['mappings'] = fee_mappings
@@ -209,11 +364,10 @@ def find_fee_rate_pairs(df):
     Returns:
         dict: Fee type to rate mappings
     """
-    mappings = {}
+    view = _as_view(df)
+    df = view.df
 
-    # Keywords that might indicate fee types
-    fee_keywords = ['fee', 'charge', 'cost', 'type', 'service', 'transaction']
-    rate_keywords = ['rate', 'amount', 'price', 'cost', 'chart', 'value']
+    mappings = {}
 
     # Try different strategies to find fee-rate pairs
 
@@ -222,91 +376,111 @@ def find_fee_rate_pairs(df):
         col1 = df.columns[col_idx]
         col2 = df.columns[col_idx + 1]
 
-        col1_str = str(col1).lower()
-        col2_str = str(col2).lower()
-
         # Check if columns might be fee type and rate
-        is_fee_col1 = any(keyword in col1_str for keyword in fee_keywords)
-        is_rate_col2 = any(keyword in col2_str for keyword in rate_keywords)
+        is_fee_col1 = bool(_FEE_RE.search(str(col1)))
+        is_rate_col2 = bool(_RATE_RE.search(str(col2)))
 
         if is_fee_col1 and is_rate_col2:
-            pair_mappings = extract_mappings_from_columns(df, col1, col2)
+            pair_mappings = extract_mappings_from_columns(view, col_idx, col_idx + 1)
             mappings.update(pair_mappings)
 
     # Strategy 2: Look for data patterns (skip header rows and find actual data)
     if not mappings:
-        mappings = extract_mappings_by_pattern(df)
+        mappings = extract_mappings_by_pattern(view)
 
     return mappings
 
-def extract_mappings_from_columns(df, fee_col, rate_col):
+def extract_mappings_from_columns(view, fee_idx, rate_idx):
     """
-    Extract fee-rate mappings from specific columns
+    Extract fee-rate mappings from a located fee/rate column pair
 
     Args:
-        df (DataFrame): Sheet data
-        fee_col: Fee type column name
-        rate_col: Rate column name
+        view (SheetView): Sheet data with cached string arrays
+        fee_idx (int): Fee type column position
+        rate_idx (int): Rate column position
 
     Returns:
         dict: Fee type to rate mappings
     """
-    mappings = {}
-
-    for idx, row in df.iterrows():
-        fee_type = row[fee_col]
-        rate_value = row[rate_col]
+    view = _as_view(view)
 
-        # Skip empty, NaN, or header-like values
-        if (pd.notna(fee_type) and pd.notna(rate_value) and
-            not str(fee_type).lower().strip() in ['fee type', 'type', 's.no.', 'sno', 'sr.no', 'fee type '] and
-            not str(rate_value).lower().strip() in ['rate', 'amount', 'chart', 'rates chart', 'rates chart '] and
-            str(fee_type).strip() != '' and str(rate_value).strip() != ''):
+    fee = view.strs[:, fee_idx]
+    rate = view.strs[:, rate_idx]
 
-            mappings[str(fee_type).strip()] = str(rate_value).strip()
+    # Skip empty, NaN, or header-like values - one boolean mask instead of
+    # per-row Python checks
+    mask = (view.notna[:, fee_idx] & view.notna[:, rate_idx] &
+            ~np.isin(view.str_lo[:, fee_idx], list(_HEADER_FEE)) &
+            ~np.isin(view.str_lo[:, rate_idx], list(_HEADER_RATE)) &
+            (fee != '') & (rate != ''))
 
-    return mappings
+    return dict(zip(fee[mask], rate[mask]))
 
 def extract_mappings_by_pattern(df):
     """
     Extract mappings by analyzing data patterns across all columns
 
     Args:
-        df (DataFrame): Sheet data
+        df (DataFrame or SheetView): Sheet data
 
     Returns:
         dict: Fee type to rate mappings
     """
-    mappings = {}
+    view = _as_view(df)
+    df = view.df
 
-    # Look for patterns where one column has descriptive text and another has rates
-    for col_idx in range(len(df.columns) - 1):
-        for next_col_idx in range(col_idx + 1, len(df.columns)):
-            col1 = df.columns[col_idx]
-            col2 = df.columns[next_col_idx]
-
-            # Get non-null values from both columns
-            col1_data = df[col1].dropna()
-            col2_data = df[col2].dropna()
-
-            # Check if one column looks like descriptions and other like rates
-            if len(col1_data) > 0 and len(col2_data) > 0:
-                # Skip if columns have different lengths
-                min_len = min(len(col1_data), len(col2_data))
-
-                for i in range(min_len):
-                    if i < len(col1_data) and i < len(col2_data):
-                        val1 = col1_data.iloc[i]
-                        val2 = col2_data.iloc[i]
-
-                        # Check if first column looks like text description
-                        # and second looks like rate/amount
-                        if (isinstance(val1, str) and len(str(val1).strip()) > 3 and
-                            not str(val1).lower().strip() in ['fee type', 'type', 's.no.', 'sno', 'fee type ', 'rates chart', 'rates chart '] and
-                            not str(val2).lower().strip() in ['rate', 'amount', 'chart', 'rates chart', 'rates chart '] and
-                            str(val1).strip() != '' and str(val2).strip() != ''):
+    mappings = {}
 
-                            mappings[str(val1).strip()] = str(val2).strip()
+    header_fee = ['fee type', 'type', 's.no.', 'sno', 'rates chart']
+    header_rate = ['rate', 'amount', 'chart', 'rates chart']
+
+    # Precompute per-column masks once from the shared view, so each column
+    # pair below is just a couple of array ops instead of per-cell .iloc reads
+    col_info = []
+    for j, dtype in enumerate(df.dtypes):
+        present = view.notna[:, j]
+        strs = view.strs[:, j][present]
+        lo = view.str_lo[:, j][present]
+
+        # Dtype dispatch for the "is this cell text" test: numeric and
+        # datetime columns can never hold descriptions, string columns always
+        # do - only object columns need the per-cell isinstance scan
+        if dtype == object:
+            is_text = np.fromiter(
+                (isinstance(v, str) for v in df.iloc[:, j].to_numpy()[present]),
+                dtype=bool, count=len(strs))
+        elif isinstance(dtype, pd.StringDtype):
+            is_text = np.ones(len(strs), dtype=bool)
+        else:
+            is_text = np.zeros(len(strs), dtype=bool)
+
+        # Looks like a text description
+        desc_mask = (is_text & (np.char.str_len(strs) > 3) &
+                     ~np.isin(lo, header_fee) & (strs != ''))
+        # Usable as a rate/amount value
+        rate_mask = ~np.isin(lo, header_rate) & (strs != '')
+
+        col_info.append((strs, desc_mask, rate_mask))
+
+    # Look for patterns where one column has descriptive text and another has
+    # rates; columns whose masks are empty are pruned before pairing
+    for col_idx in range(len(col_info) - 1):
+        s1, desc1, _ = col_info[col_idx]
+        if not desc1.any():
+            continue
+        for next_col_idx in range(col_idx + 1, len(col_info)):
+            s2, _, rate2 = col_info[next_col_idx]
+            if not rate2.any():
+                continue
+
+            # Skip if columns have different lengths
+            min_len = min(len(s1), len(s2))
+            if min_len == 0:
+                continue
+
+            combined = desc1[:min_len] & rate2[:min_len]
+            if combined.any():
+                mappings.update(zip(s1[:min_len][combined], s2[:min_len][combined]))
 
     return mappings
 
@@ -323,18 +497,13 @@ def extract_card_issuance_data(file_path):
     try:
         print(f"Analyzing card issuance file: {os.path.basename(file_path)}")
 
-        xl_file = pd.ExcelFile(file_path)
-        sheets = xl_file.sheet_names
-
         card_data = {
             'total_cards': 0,
             'monthly_data': [],
             'raw_data': {}
         }
 
-        for sheet_name in sheets:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-
+        for sheet_name, df in _fast_read_sheets(file_path):
             # Look for card issuance patterns
             cards_found = find_card_issuance_values(df, sheet_name)
             if cards_found:
@@ -361,56 +530,57 @@ def find_card_issuance_values(df, sheet_name):
     Returns:
         dict: Found card issuance data
     """
+    view = _as_view(df)
+    df = view.df
+
     result = {}
     monthly_data = []
 
+    if df.empty:
+        return result
+
+    # The lowered/stripped cell arrays come precomputed with the view
+    raw = df.to_numpy(dtype=object)
+    str_lo = view.str_lo
+    n_rows, n_cols = str_lo.shape
+
     # Look for total cards pattern
-    total_keywords = ['total', 'total cards', 'cards issued', 'quarter']
-
-    for idx, row in df.iterrows():
-        for col in df.columns:
-            cell_value = str(row[col]).lower().strip()
-
-            # Check for total cards
-            if any(keyword in cell_value for keyword in total_keywords):
-                # Look for number in adjacent cells
-                for next_col in df.columns:
-                    adjacent_value = row[next_col]
-                    if pd.notna(adjacent_value) and str(adjacent_value).isdigit():
-                        result['total_cards'] = int(adjacent_value)
-                        print(f"   Found total cards: {result['total_cards']}")
-                        break
+    total_mask = _contains_any(str_lo, _TOTAL_KEYWORDS)
+
+    for i in np.nonzero(total_mask.any(axis=1))[0]:
+        # Look for number in adjacent cells
+        for j in range(n_cols):
+            adjacent_value = raw[i, j]
+            if pd.notna(adjacent_value):
+                count = _as_int(adjacent_value)
+                if count is not None:
+                    result['total_cards'] = count
+                    print(f"   Found total cards: {result['total_cards']}")
+                    break
 
     # Look for monthly/period data
-    period_keywords = ['apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec', 'period', 'month']
+    period_mask = _contains_any(str_lo, _PERIOD_KEYWORDS)
+    period_mask &= np.char.str_len(str_lo) < 20
 
-    for idx, row in df.iterrows():
-        period_found = False
-        period_name = ""
+    for i in np.nonzero(period_mask.any(axis=1))[0]:
+        period_name = str(raw[i, int(np.argmax(period_mask[i]))]).strip()
         cards_count = 0
 
-        for col in df.columns:
-            cell_value = str(row[col]).lower().strip()
-
-            # Check if this looks like a period
-            if any(keyword in cell_value for keyword in period_keywords) and len(cell_value) < 20:
-                period_found = True
-                period_name = str(row[col]).strip()
+        # Look for number in same row
+        for j in range(n_cols):
+            adjacent_value = raw[i, j]
+            if pd.notna(adjacent_value):
+                count = _as_int(adjacent_value)
+                if count is not None and count > 0:
+                    cards_count = count
+                    break
 
-                # Look for number in same row
-                for next_col in df.columns:
-                    adjacent_value = row[next_col]
-                    if pd.notna(adjacent_value) and str(adjacent_value).replace(',', '').isdigit():
-                        cards_count = int(str(adjacent_value).replace(',', ''))
-                        break
-
-                if cards_count > 0:
-                    monthly_data.append({
-                        'period': period_name,
-                        'cards': cards_count
-                    })
-                    print(f"   Found period data: {period_name} - {cards_count} cards")
-                break
+        if cards_count > 0:
+            monthly_data.append({
+                'period': period_name,
+                'cards': cards_count
+            })
+            print(f"   Found period data: {period_name} - {cards_count} cards")
 
     if monthly_data:
         result['monthly_data'] = monthly_data
@@ -432,25 +602,26 @@ def calculate_fee_amount(rate_formula, card_count, transaction_count=0, transact
     """
     try:
         rate_formula = str(rate_formula).strip()
+        formula_lower = rate_formula.lower()
 
         # Handle different rate formula patterns
-        if 'first' in rate_formula.lower() and 'thereafter' in rate_formula.lower():
+        if 'first' in formula_lower and 'thereafter' in formula_lower:
             # Tiered pricing like "$2 for first 30K cards\n$1.5 per card thereafter"
             return calculate_tiered_card_fee(rate_formula, card_count)
 
-        elif 'per transaction' in rate_formula.lower():
+        elif 'per transaction' in formula_lower:
             # Per transaction fee like "Rs 0.25 per transaction"
             return calculate_per_transaction_fee(rate_formula, transaction_count)
 
-        elif 'per dispute' in rate_formula.lower():
+        elif 'per dispute' in formula_lower:
             # Per dispute fee like "Rs 250 per dispute"
             return calculate_per_dispute_fee(rate_formula, transaction_count)
 
-        elif 'no of tran' in rate_formula.lower() and '$' in rate_formula:
+        elif 'no of tran' in formula_lower and '$' in rate_formula:
             # Transaction count based like "No of tran * 5$"
             return calculate_transaction_volume_fee(rate_formula, transaction_count)
 
-        elif 'amount of tran' in rate_formula.lower() or 'amout of tran' in rate_formula.lower():
+        elif 'amount of tran' in formula_lower or 'amout of tran' in formula_lower:
             # Transaction amount based like "Amount of tran *0.5$" or "Amount of tran *Rs0.25"
             return calculate_transaction_amount_fee(rate_formula, transaction_amount)
 
@@ -495,14 +666,14 @@ def calculate_tiered_card_fee(rate_formula, card_count):
         # Pattern: "$2 for first 30K cards\n$1.5 per card thereafter"
 
         # Find first tier rate and threshold
-        first_rate_match = re.search(r'\$?(\d+(?:\.\d+)?)', rate_formula)
-        threshold_match = re.search(r'(\d+)k', rate_formula.lower())
+        first_rate_match = _NUM_RE.search(rate_formula)
+        threshold_match = _THRESHOLD_RE.search(rate_formula)
 
         # Find second tier rate
         lines = rate_formula.split('\n')
         second_rate = 0
         if len(lines) > 1:
-            second_rate_match = re.search(r'\$?(\d+(?:\.\d+)?)', lines[1])
+            second_rate_match = _NUM_RE.search(lines[1])
             if second_rate_match:
                 second_rate = float(second_rate_match.group(1))
 
@@ -541,7 +712,7 @@ def calculate_tiered_card_fee(rate_formula, card_count):
 def calculate_per_transaction_fee(rate_formula, transaction_count):
     """Calculate per transaction fee"""
     try:
-        rate_match = re.search(r'(\d+(?:\.\d+)?)', rate_formula)
+        rate_match = _NUM_RE.search(rate_formula)
         if rate_match:
             rate = float(rate_match.group(1))
             amount = transaction_count * rate
@@ -563,7 +734,7 @@ def calculate_per_transaction_fee(rate_formula, transaction_count):
 def calculate_per_dispute_fee(rate_formula, dispute_count):
     """Calculate per dispute fee"""
     try:
-        rate_match = re.search(r'(\d+(?:\.\d+)?)', rate_formula)
+        rate_match = _NUM_RE.search(rate_formula)
         if rate_match:
             rate = float(rate_match.group(1))
             amount = dispute_count * rate
@@ -585,7 +756,7 @@ def calculate_per_dispute_fee(rate_formula, dispute_count):
 def calculate_transaction_volume_fee(rate_formula, transaction_count):
     """Calculate transaction volume fee like 'No of tran * 5$'"""
     try:
-        rate_match = re.search(r'(\d+(?:\.\d+)?)', rate_formula)
+        rate_match = _NUM_RE.search(rate_formula)
         if rate_match:
             rate = float(rate_match.group(1))
             amount = transaction_count * rate
@@ -608,10 +779,10 @@ def calculate_transaction_amount_fee(rate_formula, transaction_amount):
     """Calculate transaction amount based fee like 'Amount of tran *0.5$' or 'Amount of tran *Rs0.25'"""
     try:
         # Extract the rate number (could be after * or before currency)
-        rate_match = re.search(r'\*\s*(?:Rs|rs|\$)?(\d+(?:\.\d+)?)', rate_formula)
+        rate_match = _RATE_STAR_RE.search(rate_formula)
         if not rate_match:
             # Try alternative pattern
-            rate_match = re.search(r'(\d+(?:\.\d+)?)', rate_formula)
+            rate_match = _NUM_RE.search(rate_formula)
 
         if rate_match:
             rate = float(rate_match.group(1))
@@ -633,6 +804,175 @@ def calculate_transaction_amount_fee(rate_formula, transaction_amount):
 
     return {'calculated_amount': 0, 'calculation_method': 'Error', 'formula_used': rate_formula}
 
+def calculate_fee_amount_vec(rate_formulas, card_counts=0, transaction_counts=0, transaction_amounts=0):
+    """
+    Vectorized counterpart of calculate_fee_amount for a whole Series of formulas
+
+    Classifies every formula once with vectorized string tests and computes the
+    per-transaction / per-dispute / volume / amount buckets with array
+    arithmetic; only the rare tiered formulas fall back to the scalar path.
+
+    Args:
+        rate_formulas: Series (or sequence) of rate formulas
+        card_counts: scalar or aligned sequence of card counts
+        transaction_counts: scalar or aligned sequence of transaction counts
+        transaction_amounts: scalar or aligned sequence of transaction amounts
+
+    Returns:
+        DataFrame: calculated_amount / calculation_method / formula_used / currency
+    """
+    formulas = pd.Series(rate_formulas).astype(str).str.strip()
+    idx = formulas.index
+    fl = formulas.str.lower()
+
+    def _aligned(values):
+        if np.ndim(values) == 0:
+            return pd.Series(values, index=idx)
+        return pd.Series(np.asarray(values), index=idx)
+
+    cards = _aligned(card_counts)
+    tx_counts = _aligned(transaction_counts)
+    tx_amounts = _aligned(transaction_amounts)
+
+    amount = pd.Series(0.0, index=idx)
+    method = pd.Series('Unknown Formula', index=idx, dtype=object)
+    currency = pd.Series('$', index=idx, dtype=object)
+
+    rate = pd.to_numeric(formulas.str.extract(_NUM_RE, expand=False), errors='coerce').astype(float)
+    star_rate = pd.to_numeric(formulas.str.extract(_RATE_STAR_RE, expand=False), errors='coerce').fillna(rate).astype(float)
+    rs_mask = fl.str.contains('rs', regex=False)
+
+    remaining = pd.Series(True, index=idx)
+
+    # Tiered pricing is rare and stateful - reuse the scalar helper per row
+    m = remaining & fl.str.contains('first', regex=False) & fl.str.contains('thereafter', regex=False)
+    for i in idx[m]:
+        res = calculate_tiered_card_fee(formulas[i], cards[i])
+        amount[i] = res['calculated_amount']
+        method[i] = res['calculation_method']
+        currency[i] = res.get('currency', '$')
+    remaining &= ~m
+
+    # Per transaction fees
+    m = remaining & fl.str.contains('per transaction', regex=False)
+    ok = m & rate.notna()
+    amount[ok] = tx_counts[ok] * rate[ok]
+    currency[ok] = np.where(rs_mask[ok], 'Rs', '$')
+    method[ok] = [f"{c} transactions × {cur}{r}"
+                  for c, cur, r in zip(tx_counts[ok], currency[ok], rate[ok])]
+    method[m & ~ok] = 'Error'
+    remaining &= ~m
+
+    # Per dispute fees
+    m = remaining & fl.str.contains('per dispute', regex=False)
+    ok = m & rate.notna()
+    amount[ok] = tx_counts[ok] * rate[ok]
+    currency[ok] = np.where(rs_mask[ok], 'Rs', '$')
+    method[ok] = [f"{c} disputes × {cur}{r}"
+                  for c, cur, r in zip(tx_counts[ok], currency[ok], rate[ok])]
+    method[m & ~ok] = 'Error'
+    remaining &= ~m
+
+    # Transaction volume fees like "No of tran * 5$"
+    m = remaining & fl.str.contains('no of tran', regex=False) & formulas.str.contains('$', regex=False)
+    ok = m & rate.notna()
+    amount[ok] = tx_counts[ok] * rate[ok]
+    method[ok] = [f"{c} transactions × ${r}" for c, r in zip(tx_counts[ok], rate[ok])]
+    method[m & ~ok] = 'Error'
+    remaining &= ~m
+
+    # Transaction amount fees like "Amount of tran *0.5$"
+    m = remaining & (fl.str.contains('amount of tran', regex=False) |
+                     fl.str.contains('amout of tran', regex=False))
+    ok = m & star_rate.notna()
+    amount[ok] = tx_amounts[ok] * star_rate[ok]
+    currency[ok] = np.where(rs_mask[ok], 'Rs', '$')
+    method[ok] = [f"${a:,} × {r}" for a, r in zip(tx_amounts[ok], star_rate[ok])]
+    method[m & ~ok] = 'Error'
+    remaining &= ~m
+
+    # Fixed amounts
+    m = remaining & fl.str.isdigit().fillna(False).astype(bool)
+    amount[m] = pd.to_numeric(formulas[m])
+    method[m] = 'Fixed Amount'
+
+    return pd.DataFrame({
+        'calculated_amount': amount,
+        'calculation_method': method,
+        'formula_used': formulas,
+        'currency': currency
+    })
+
+def compute_fee_rows(mappings, card_data, transaction_data):
+    """
+    Compute calculated amounts for one sheet's fee-to-rate mappings
+
+    Single source of truth shared by the terminal display and the web result
+    builder, so the bucket selection and formula evaluation run once per
+    sheet instead of once per caller.
+
+    Args:
+        mappings (dict): Fee type to rate chart mappings
+        card_data (dict): Card issuance data or None
+        transaction_data (dict): Per-type transaction Buckets or None
+
+    Returns:
+        list: Row dicts with the raw, unformatted calculation fields
+    """
+    fee_types = list(mappings.keys())
+    rate_charts = list(mappings.values())
+    if not fee_types:
+        return []
+
+    card_count = card_data['total_cards'] if card_data else 0
+
+    transaction_counts = 0
+    transaction_amounts = 0
+    if transaction_data:
+        # Choose appropriate transaction data based on fee type
+        ft_lo = pd.Series(fee_types, dtype=str).str.lower()
+        conditions = [ft_lo.str.contains('international', regex=False),
+                      ft_lo.str.contains('domestic', regex=False),
+                      ft_lo.str.contains('dispute', regex=False)]
+        empty = Bucket()
+        buckets = [transaction_data.get('international', empty),
+                   transaction_data.get('domestic', empty),
+                   transaction_data.get('disputes', empty)]
+        # General fees fall back to the combined totals
+        general = transaction_data.get('all_transactions', empty)
+        transaction_counts = np.select(
+            conditions, [b.total_volume for b in buckets],
+            default=general.total_volume)
+        transaction_amounts = np.select(
+            conditions, [b.total_amount for b in buckets],
+            default=general.total_amount)
+
+    calc_results = calculate_fee_amount_vec(
+        rate_charts,
+        card_count,
+        transaction_counts=transaction_counts,
+        transaction_amounts=transaction_amounts
+    )
+
+    rows = []
+    for fee_type, rate_chart, calc in zip(
+            fee_types, rate_charts,
+            calc_results.itertuples(index=False)):
+        currency_symbol = calc.currency
+        exchange_rate = 78 if currency_symbol == '$' else 1  # USD to INR = 78, INR = 1
+        calculated_amount = calc.calculated_amount
+        final_amount = calculated_amount * exchange_rate if calculated_amount > 0 else 0
+        rows.append({
+            'fee_type': fee_type,
+            'rate_chart': rate_chart,
+            'calculated_amount': calculated_amount,
+            'calculation_method': calc.calculation_method,
+            'currency_symbol': currency_symbol,
+            'exchange_rate': exchange_rate,
+            'final_amount': final_amount
+        })
+    return rows
+
 def extract_dispute_data_from_vrol(df):
     """
     Extract dispute information from VROL dataframe using working logic from standalone tool
@@ -643,58 +983,59 @@ def extract_dispute_data_from_vrol(df):
     Returns:
         dict: Dispute information
     """
+    view = _as_view(df)
+
     dispute_info = {
         'total_disputes': 0,
         'total_amount': 0,
         'individual_disputes': []
     }
 
+    if view.df.empty:
+        return dispute_info
+
+    # The stringified cell arrays come precomputed with the view
+    notna = view.notna
+    strs = view.strs
+    str_lo = view.str_lo
+    n_rows, n_cols = strs.shape
+
     # Look for dispute count patterns
-    for idx, row in df.iterrows():
-        for col in df.columns:
-            cell_value = str(row[col]).lower().strip()
-
-            # Check for dispute count indicators
-            if ('no of disputed' in cell_value or
-                'number of disputed' in cell_value or
-                'disputed transactions' in cell_value):
-
-                # Look for number in adjacent cells
-                for check_col in df.columns:
-                    adjacent_value = row[check_col]
-                    if (pd.notna(adjacent_value) and
-                        str(adjacent_value).replace(',', '').isdigit()):
-                        count = int(str(adjacent_value).replace(',', ''))
-                        if count > 0 and count < 1000:  # Reasonable dispute count
-                            dispute_info['total_disputes'] = max(dispute_info['total_disputes'], count)
-                            print(f"   Found dispute count: {count}")
-
-    # Also look for individual disputed transactions (X, Y, etc.)
+    label_mask = _contains_any(str_lo, _DISPUTE_KEYWORDS)
+
+    for i in np.nonzero(label_mask.any(axis=1))[0]:
+        # Look for numbers in adjacent cells
+        for j in range(n_cols):
+            if notna[i, j]:
+                cleaned = strs[i, j].replace(',', '')
+                if cleaned.isdigit():
+                    count = int(cleaned)
+                    if count > 0 and count < 1000:  # Reasonable dispute count
+                        dispute_info['total_disputes'] = max(dispute_info['total_disputes'], count)
+                        print(f"   Found dispute count: {count}")
+
+    # Also look for individual disputed transactions (X, Y, etc.).
+    # Precompute id-like and amount-like masks for the whole sheet so the
+    # pair walk below only touches booleans - no string work per iteration
+    cleaned = np.char.replace(strs, ',', '')
+    is_id = (np.char.str_len(strs) <= 2) & np.char.isalnum(strs)
+    is_amt = np.char.isdigit(np.char.replace(cleaned, '.', ''))
+
     transactions = []
-    for idx, row in df.iterrows():
-        row_values = []
-        for col in df.columns:
-            val = row[col]
-            if pd.notna(val):
-                row_values.append(str(val).strip())
+    col_idx = np.arange(n_cols)
+    for i in range(n_rows):
+        cols = col_idx[notna[i]]
 
         # Look for single letter/short ID followed by amount
-        if len(row_values) >= 2:
-            for i in range(len(row_values) - 1):
-                id_val = row_values[i]
-                amount_val = row_values[i + 1]
-
-                # Check if looks like dispute transaction (single letter + amount)
-                if (len(id_val) <= 2 and id_val.isalnum() and
-                    amount_val.replace(',', '').replace('.', '').isdigit() and
-                    float(amount_val.replace(',', '')) > 0):
-
-                    amount = float(amount_val.replace(',', ''))
+        for a, b in zip(cols[:-1], cols[1:]):
+            if is_id[i, a] and is_amt[i, b]:
+                amount = float(cleaned[i, b])
+                if amount > 0:
                     transactions.append({
-                        'id': id_val,
+                        'id': strs[i, a],
                         'amount': amount
                     })
-                    print(f"   Found disputed transaction: {id_val} - ${amount:,.0f}")
+                    print(f"   Found disputed transaction: {strs[i, a]} - ${amount:,.0f}")
 
     if transactions:
         dispute_info['individual_disputes'] = transactions
@@ -706,6 +1047,25 @@ def extract_dispute_data_from_vrol(df):
 
     return dispute_info
 
+def _analyze_transaction_sheet(df, expected_type):
+    """Analyze one sheet of a transaction file and return its candidate totals"""
+    # One view per sheet shares the stringified arrays across analyzers
+    view = _make_view(df)
+
+    if expected_type == 'disputes':
+        # Special handling for dispute files using the working logic
+        dispute_data = extract_dispute_data_from_vrol(view)
+        return Bucket(total_amount=dispute_data['total_amount'],
+                      total_volume=dispute_data['total_disputes'],
+                      transactions=dispute_data['individual_disputes'])
+
+    # Standard handling for international/domestic
+    transactions = find_transaction_entries(view)
+    totals = find_transaction_totals(view)
+    return Bucket(total_amount=totals.get('amount', 0),
+                  total_volume=totals.get('volume', len(transactions)),
+                  transactions=transactions)
+
 def process_specific_transaction_file(file_path, expected_type):
     """
     Process a specific transaction file for a specific transaction type
@@ -715,45 +1075,34 @@ def process_specific_transaction_file(file_path, expected_type):
         expected_type (str): Expected transaction type (international, domestic, disputes)
 
     Returns:
-        dict: Transaction data for the specific type
+        Bucket: Transaction data for the specific type
     """
     if not file_path or not os.path.exists(file_path):
-        return {'total_amount': 0, 'total_volume': 0, 'transactions': []}
+        return Bucket()
 
     try:
         print(f"Processing {expected_type} transaction file: {os.path.basename(file_path)}")
 
-        xl_file = pd.ExcelFile(file_path)
-        sheets = xl_file.sheet_names
-
-        best_data = {'total_amount': 0, 'total_volume': 0, 'transactions': []}
+        best_data = Bucket()
 
-        for sheet_name in sheets:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+        # Stream sheets here while worker threads analyze them; results are
+        # reduced in sheet order so the "best sheet wins" ties stay stable
+        compare_key = 'total_volume' if expected_type == 'disputes' else 'total_amount'
+        with ThreadPoolExecutor() as ex:
+            futures = [ex.submit(_analyze_transaction_sheet, df, expected_type)
+                       for _, df in _fast_read_sheets(file_path)]
 
-            if expected_type == 'disputes':
-                # Special handling for dispute files using the working logic
-                dispute_data = extract_dispute_data_from_vrol(df)
-                if dispute_data['total_disputes'] > best_data['total_volume']:
-                    best_data['total_amount'] = dispute_data['total_amount']
-                    best_data['total_volume'] = dispute_data['total_disputes']
-                    best_data['transactions'] = dispute_data['individual_disputes']
-            else:
-                # Standard handling for international/domestic
-                transactions = find_transaction_entries(df)
-                totals = find_transaction_totals(df)
+            for future in futures:
+                candidate = future.result()
+                if getattr(candidate, compare_key) > getattr(best_data, compare_key):
+                    best_data = candidate
 
-                if totals.get('amount', 0) > best_data['total_amount']:
-                    best_data['total_amount'] = totals.get('amount', 0)
-                    best_data['total_volume'] = totals.get('volume', len(transactions))
-                    best_data['transactions'] = transactions
-
-        print(f"   Found {expected_type}: Amount=${best_data['total_amount']:,}, Volume={best_data['total_volume']}")
+        print(f"   Found {expected_type}: Amount=${best_data.total_amount:,}, Volume={best_data.total_volume}")
         return best_data
 
     except Exception as e:
         print(f"Error processing {expected_type} file: {str(e)}")
-        return {'total_amount': 0, 'total_volume': 0, 'transactions': []}
+        return Bucket()
 
 
 def extract_transactions_from_sheet(df, sheet_name):
@@ -767,19 +1116,21 @@ def extract_transactions_from_sheet(df, sheet_name):
     Returns:
         dict: Extracted transaction data
     """
+    view = _as_view(df)
+
     sheet_data = {
-        'type': determine_transaction_type(sheet_name, df),
+        'type': determine_transaction_type(sheet_name, view),
         'transactions': [],
         'total_amount': 0,
         'total_volume': 0
     }
 
     # Look for transaction patterns
-    transactions = find_transaction_entries(df)
+    transactions = find_transaction_entries(view)
     sheet_data['transactions'] = transactions
 
     # Look for totals
-    totals = find_transaction_totals(df)
+    totals = find_transaction_totals(view)
     if totals:
         sheet_data['total_amount'] = totals.get('amount', 0)
         sheet_data['total_volume'] = totals.get('volume', 0)
@@ -814,33 +1165,38 @@ def determine_transaction_type(sheet_name, df):
     elif 'dispute' in sheet_name_lower or 'vrol' in sheet_name_lower:
         return 'disputes'
 
-    # Check content of the sheet - enhanced detection
-    sheet_content = ' '.join(df.astype(str).values.flatten()).lower()
+    # Check content of the sheet - enhanced detection; substring tests run
+    # over the precomputed cell arrays instead of one giant joined string
+    view = _as_view(df)
+    if view.df.empty:
+        return 'unknown'
+
+    cells = view.strs
+    cells_lo = view.str_lo
+
+    def _content_has(*patterns):
+        return any((np.char.find(cells_lo, pattern) >= 0).any() for pattern in patterns)
 
     # Look for specific patterns that indicate transaction type
-    if 'international transaction' in sheet_content or 'international transations' in sheet_content:
+    if _content_has('international transaction', 'international transations'):
         return 'international'
-    elif 'domestic transaction' in sheet_content:
+    elif _content_has('domestic transaction'):
         return 'domestic'
-    elif 'dispute' in sheet_content or 'vrol' in sheet_content or 'transaction dispute' in sheet_content:
+    elif _content_has('dispute', 'vrol'):
         return 'disputes'
 
     # Additional check: Look at the data patterns
     # If we see transaction IDs like A, B, C... it's likely international
     # If we see transaction IDs like K, L, M... it might be domestic
-    transaction_ids = []
-    for idx, row in df.iterrows():
-        for col in df.columns:
-            val = str(row[col]).strip()
-            if len(val) == 1 and val.isalpha():
-                transaction_ids.append(val)
+    singles = cells[np.char.str_len(cells) == 1]
+    transaction_ids = set(singles[np.char.isalpha(singles)].tolist())
 
     if transaction_ids:
         # If we see early alphabet letters, likely international
-        if any(tid in ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J'] for tid in transaction_ids):
+        if transaction_ids & set('ABCDEFGHIJ'):
             return 'international'
         # If we see later alphabet letters, likely domestic
-        elif any(tid in ['K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T'] for tid in transaction_ids):
+        elif transaction_ids & set('KLMNOPQRST'):
             return 'domestic'
 
     return 'unknown'
@@ -855,6 +1211,9 @@ def find_transaction_entries(df):
     Returns:
         list: List of transaction dictionaries
     """
+    view = _as_view(df)
+    df = view.df
+
     transactions = []
 
     # Look for transaction ID and amount columns
@@ -868,24 +1227,25 @@ def find_transaction_entries(df):
         elif 'amount' in col_str:
             transaction_cols['amount'] = col
 
-    # If we found both columns, extract transactions
-    if transaction_cols['id'] is not None and transaction_cols['amount'] is not None:
-        for idx, row in df.iterrows():
-            transaction_id = row[transaction_cols['id']]
-            amount = row[transaction_cols['amount']]
+    # If we found both columns, validate all rows in one vectorized pass
+    # instead of per-cell strip/isdigit calls
+    if (transaction_cols['id'] is not None and transaction_cols['amount'] is not None
+            and len(df)):
+        j_id = df.columns.get_loc(transaction_cols['id'])
+        j_amt = df.columns.get_loc(transaction_cols['amount'])
 
-            if (pd.notna(transaction_id) and pd.notna(amount) and
-                str(transaction_id).strip() not in ['transaction id', 'id', ''] and
-                str(amount).replace(',', '').replace('.', '').isdigit()):
+        ids = view.strs[:, j_id]
+        amts_clean = np.char.replace(view.strs[:, j_amt], ',', '')
+        valid = (view.notna[:, j_id] & view.notna[:, j_amt] &
+                 np.char.isdigit(np.char.replace(amts_clean, '.', '')) &
+                 ~np.isin(ids, ('transaction id', 'id', '')))
 
-                transactions.append({
-                    'id': str(transaction_id).strip(),
-                    'amount': float(str(amount).replace(',', ''))
-                })
+        transactions = [{'id': str(tid), 'amount': float(amt)}
+                        for tid, amt in zip(ids[valid], amts_clean[valid].astype(float))]
 
     # Alternative: Look for any ID-amount patterns in the data
     if not transactions:
-        transactions = find_id_amount_patterns(df)
+        transactions = find_id_amount_patterns(view)
 
     return transactions
 
@@ -899,14 +1259,15 @@ def find_id_amount_patterns(df):
     Returns:
         list: List of transaction dictionaries
     """
+    view = _as_view(df)
+    notna = view.notna
+    strs = view.strs
+
     transactions = []
 
-    for idx, row in df.iterrows():
-        row_values = []
-        for col in df.columns:
-            val = row[col]
-            if pd.notna(val):
-                row_values.append(str(val).strip())
+    for i_row in range(strs.shape[0]):
+        # Compact the row to its present cells with one mask index
+        row_values = strs[i_row][notna[i_row]]
 
         # Look for patterns like: single character/short string followed by number
         if len(row_values) >= 2:
@@ -914,16 +1275,17 @@ def find_id_amount_patterns(df):
                 id_val = row_values[i]
                 amount_val = row_values[i + 1]
 
-                # Check if first value looks like ID and second like amount
+                # Check if first value looks like ID and second like amount -
+                # one regex match instead of a chain of replace/isdigit passes
                 if (len(id_val) <= 3 and id_val.isalnum() and
-                    amount_val.replace(',', '').replace('.', '').isdigit() and
-                    float(amount_val.replace(',', '')) > 0):
-
-                    transactions.append({
-                        'id': id_val,
-                        'amount': float(amount_val.replace(',', ''))
-                    })
-                    break
+                        _is_numlike(amount_val)):
+                    amount = float(amount_val.replace(',', ''))
+                    if amount > 0:
+                        transactions.append({
+                            'id': id_val,
+                            'amount': amount
+                        })
+                        break
 
     return transactions
 
@@ -937,84 +1299,96 @@ def find_transaction_totals(df):
     Returns:
         dict: Total amount and volume
     """
-    totals = {}
+    view = _as_view(df)
+    df = view.df
 
-    # Keywords for totals - enhanced for better detection
-    total_keywords = ['total', 'sum', 'grand total', 'total of', 'total amount']
-    volume_keywords = ['volume', 'count', 'number', 'transactions', 'volume of', 'no of', 'disputed transactions']
-
-    for idx, row in df.iterrows():
-        for col in df.columns:
-            cell_value = str(row[col]).lower().strip()
+    totals = {}
 
+    # Even a single-column sheet can hold a total via the label-over-value
+    # pattern, so only truly empty frames skip the scan
+    if df.empty:
+        return totals
+
+    # Classify every cell in one vectorized pass: keyword masks over the
+    # lowered strings plus digit-tests for the adjacent-value candidates
+    str_lo = view.str_lo
+    n_rows, n_cols = str_lo.shape
+    cleaned = np.char.replace(view.strs, ',', '')
+    total_mask = _contains_any(str_lo, _TOTAL_AMOUNT_KEYWORDS)
+    vol_mask = _contains_any(str_lo, _VOLUME_KEYWORDS)
+    dispute_mask = _contains_any(str_lo, _DISPUTE_KEYWORDS)
+
+    # Eligible adjacent cells: integer-like for volumes, numeric for amounts
+    is_amt = np.char.isdigit(np.char.replace(cleaned, '.', ''))
+    is_vol = np.char.isdigit(cleaned)
+    num = pd.to_numeric(pd.Series(cleaned.ravel()), errors='coerce') \
+            .to_numpy().reshape(cleaned.shape)
+
+    # First eligible column per row (-1 when the row has no candidate)
+    amt_first = np.where(is_amt.any(axis=1), is_amt.argmax(axis=1), -1)
+    vol_first = np.where(is_vol.any(axis=1), is_vol.argmax(axis=1), -1)
+
+    # "Total of Domestic/International Transactions" pattern cells, whose
+    # value may sit in the same row or the row below
+    big_mask = is_amt & (num > 1000)  # likely total amounts
+    big_first = np.where(big_mask.any(axis=1), big_mask.argmax(axis=1), -1)
+
+    has_total_of = np.char.find(str_lo, 'total of') >= 0
+    has_domestic = np.char.find(str_lo, 'domestic') >= 0
+    has_intl = np.char.find(str_lo, 'international') >= 0
+    has_total = np.char.find(str_lo, 'total') >= 0
+    has_tran = np.char.find(str_lo, 'transaction') >= 0
+    pattern_mask = ((has_total_of & (has_domestic | has_intl)) |
+                    (has_total & has_tran))
+
+    # Single fused pass over the rows that hit anything. The pattern amount
+    # is tracked separately and applied last, preserving the precedence the
+    # original two passes had.
+    keyword_mask = total_mask | vol_mask | dispute_mask
+    pattern_amount = None
+
+    for i in np.nonzero((keyword_mask | pattern_mask).any(axis=1))[0]:
+        for j in np.nonzero(keyword_mask[i])[0]:
             # Check for total amount - enhanced detection
-            if any(keyword in cell_value for keyword in total_keywords):
-                # Look for number in adjacent cells
-                for next_col in df.columns:
-                    adjacent_value = row[next_col]
-                    if (pd.notna(adjacent_value) and
-                        str(adjacent_value).replace(',', '').replace('.', '').isdigit()):
-                        amount = float(str(adjacent_value).replace(',', ''))
-                        if amount > 1000:  # Likely a total amount
-                            totals['amount'] = amount
-                            print(f"   Found total amount: {amount:,}")
-                        break
+            if total_mask[i, j]:
+                k = amt_first[i]
+                if k >= 0:
+                    amount = float(num[i, k])
+                    if amount > 1000:  # Likely a total amount
+                        totals['amount'] = amount
+                        print(f"   Found total amount: {amount:,}")
 
             # Check for volume - enhanced detection
-            elif any(keyword in cell_value for keyword in volume_keywords):
-                # Look for number in adjacent cells
-                for next_col in df.columns:
-                    adjacent_value = row[next_col]
-                    if (pd.notna(adjacent_value) and
-                        str(adjacent_value).replace(',', '').isdigit()):
-                        volume = int(str(adjacent_value).replace(',', ''))
-                        if volume < 10000:  # Likely a volume count
-                            totals['volume'] = volume
-                            print(f"   Found transaction volume: {volume}")
-                        break
-
-            # Special check for dispute-specific patterns
-            elif ('no of disputed' in cell_value or 'number of disputed' in cell_value or
-                  'disputed transactions' in cell_value):
-                # Look for number in adjacent cells
-                for next_col in df.columns:
-                    adjacent_value = row[next_col]
-                    if (pd.notna(adjacent_value) and
-                        str(adjacent_value).replace(',', '').isdigit()):
-                        volume = int(str(adjacent_value).replace(',', ''))
+            elif vol_mask[i, j]:
+                k = vol_first[i]
+                if k >= 0:
+                    volume = int(num[i, k])
+                    if volume < 10000:  # Likely a volume count
                         totals['volume'] = volume
-                        print(f"   Found disputed transaction count: {volume}")
-                        break
+                        print(f"   Found transaction volume: {volume}")
 
-    # Additional check: Look for patterns like "Total of Domestic Transactions" with value in next row/column
-    for idx, row in df.iterrows():
-        for col in df.columns:
-            cell_value = str(row[col]).lower().strip()
-
-            # Look for domestic/international transaction totals specifically
-            if ('total of' in cell_value and ('domestic' in cell_value or 'international' in cell_value)) or \
-               ('total' in cell_value and 'transaction' in cell_value):
-
-                # Check adjacent cells and next row for the actual value
-                for check_col in df.columns:
-                    # Check same row, different column
-                    adjacent_value = row[check_col]
-                    if (pd.notna(adjacent_value) and
-                        str(adjacent_value).replace(',', '').replace('.', '').isdigit() and
-                        float(str(adjacent_value).replace(',', '')) > 1000):
-                        totals['amount'] = float(str(adjacent_value).replace(',', ''))
-                        print(f"   Found total from pattern matching: {totals['amount']:,}")
-                        break
+            # Special check for dispute-specific patterns
+            elif dispute_mask[i, j]:
+                k = vol_first[i]
+                if k >= 0:
+                    totals['volume'] = int(num[i, k])
+                    print(f"   Found disputed transaction count: {totals['volume']}")
+
+        for j in np.nonzero(pattern_mask[i])[0]:
+            # Check same row, different column
+            k = big_first[i]
+            if k >= 0:
+                pattern_amount = float(num[i, k])
+                print(f"   Found total from pattern matching: {pattern_amount:,}")
+
+            # Check next row, same column
+            if i + 1 < n_rows and big_mask[i + 1, j]:
+                pattern_amount = float(num[i + 1, j])
+                print(f"   Found total from next row: {pattern_amount:,}")
+                break
 
-                # Check next row, same column
-                if idx + 1 < len(df):
-                    next_row_value = df.iloc[idx + 1][col]
-                    if (pd.notna(next_row_value) and
-                        str(next_row_value).replace(',', '').replace('.', '').isdigit() and
-                        float(str(next_row_value).replace(',', '')) > 1000):
-                        totals['amount'] = float(str(next_row_value).replace(',', ''))
-                        print(f"   Found total from next row: {totals['amount']:,}")
-                        break
+    if pattern_amount is not None:
+        totals['amount'] = pattern_amount
 
     return totals
 
@@ -1032,20 +1406,23 @@ def merge_transaction_data(main_data, sheet_data, sheet_name):
     if transaction_type in main_data:
         # For each transaction type, only update if we haven't seen this type before
         # or if the new data is more complete
-        if main_data[transaction_type]['total_amount'] == 0:
+        bucket = main_data[transaction_type]
+        if bucket.total_amount == 0:
             # This is the first time we're seeing this transaction type
-            main_data[transaction_type]['total_amount'] = sheet_data['total_amount']
-            main_data[transaction_type]['total_volume'] = sheet_data['total_volume']
-            main_data[transaction_type]['transactions'] = sheet_data['transactions'].copy()
+            bucket.total_amount = sheet_data['total_amount']
+            bucket.total_volume = sheet_data['total_volume']
+            # Take the list as-is - sheet_data is discarded after the merge,
+            # so there is no other owner left to mutate it
+            bucket.transactions = sheet_data['transactions']
         else:
             # We already have data for this type, only add if amounts are different
             # This handles cases where the same file has multiple sheets
-            if sheet_data['total_amount'] != main_data[transaction_type]['total_amount']:
+            if sheet_data['total_amount'] != bucket.total_amount:
                 print(f"   Warning: Found different {transaction_type} amounts in multiple sheets")
                 # Take the larger amount (likely the total)
-                if sheet_data['total_amount'] > main_data[transaction_type]['total_amount']:
-                    main_data[transaction_type]['total_amount'] = sheet_data['total_amount']
-                    main_data[transaction_type]['total_volume'] = sheet_data['total_volume']
+                if sheet_data['total_amount'] > bucket.total_amount:
+                    bucket.total_amount = sheet_data['total_amount']
+                    bucket.total_volume = sheet_data['total_volume']
     else:
         print(f"Warning: Unknown transaction type '{transaction_type}' in sheet '{sheet_name}'")
 
@@ -1056,21 +1433,19 @@ def calculate_transaction_totals(transaction_data):
     Args:
         transaction_data (dict): Transaction data dictionary
     """
-    total_amount = 0
-    total_volume = 0
-
-    for trans_type in ['international', 'domestic', 'disputes']:
-        if trans_type in transaction_data:
-            total_amount += transaction_data[trans_type]['total_amount']
-            total_volume += transaction_data[trans_type]['total_volume']
+    # All three buckets always exist, so sum straight over them without the
+    # per-type membership checks
+    buckets = [transaction_data[t] for t in _TRANSACTION_TYPES]
+    total_amount = sum(b.total_amount for b in buckets)
+    total_volume = sum(b.total_volume for b in buckets)
 
-    transaction_data['all_transactions']['total_amount'] = total_amount
-    transaction_data['all_transactions']['total_volume'] = total_volume
+    transaction_data['all_transactions'].total_amount = total_amount
+    transaction_data['all_transactions'].total_volume = total_volume
 
     print(f"\nTransaction Data Summary:")
-    print(f"International: Amount=${transaction_data['international']['total_amount']:,}, Volume={transaction_data['international']['total_volume']}")
-    print(f"Domestic: Amount=${transaction_data['domestic']['total_amount']:,}, Volume={transaction_data['domestic']['total_volume']}")
-    print(f"Disputes: Amount=${transaction_data['disputes']['total_amount']:,}, Volume={transaction_data['disputes']['total_volume']}")
+    print(f"International: Amount=${transaction_data['international'].total_amount:,}, Volume={transaction_data['international'].total_volume}")
+    print(f"Domestic: Amount=${transaction_data['domestic'].total_amount:,}, Volume={transaction_data['domestic'].total_volume}")
+    print(f"Disputes: Amount=${transaction_data['disputes'].total_amount:,}, Volume={transaction_data['disputes'].total_volume}")
     print(f"Total: Amount=${total_amount:,}, Volume={total_volume}")
 
 def display_results(analysis_results, card_data=None, transaction_data=None):
@@ -1099,12 +1474,12 @@ def display_results(analysis_results, card_data=None, transaction_data=None):
 
     if transaction_data:
         print(f"\nTransaction Data Summary:")
-        if transaction_data['international']['total_amount'] > 0:
-            print(f"International Transactions: Amount=${transaction_data['international']['total_amount']:,}, Volume={transaction_data['international']['total_volume']}")
-        if transaction_data['domestic']['total_amount'] > 0:
-            print(f"Domestic Transactions: Amount=${transaction_data['domestic']['total_amount']:,}, Volume={transaction_data['domestic']['total_volume']}")
-        if transaction_data['disputes']['total_amount'] > 0:
-            print(f"Disputes: Amount=${transaction_data['disputes']['total_amount']:,}, Volume={transaction_data['disputes']['total_volume']}")
+        if transaction_data['international'].total_amount > 0:
+            print(f"International Transactions: Amount=${transaction_data['international'].total_amount:,}, Volume={transaction_data['international'].total_volume}")
+        if transaction_data['domestic'].total_amount > 0:
+            print(f"Domestic Transactions: Amount=${transaction_data['domestic'].total_amount:,}, Volume={transaction_data['domestic'].total_volume}")
+        if transaction_data['disputes'].total_amount > 0:
+            print(f"Disputes: Amount=${transaction_data['disputes'].total_amount:,}, Volume={transaction_data['disputes'].total_volume}")
 
     if card_data or transaction_data:
         print("-" * 80)
@@ -1119,73 +1494,44 @@ def display_results(analysis_results, card_data=None, transaction_data=None):
             print(f"\nSheet: '{sheet_name}'")
             print("-" * 80)
 
-            # Prepare data for tabular display with calculations
+            # Prepare data for tabular display - the shared per-sheet
+            # computation also backs the web result builder
             table_data = []
-            for i, (fee_type, rate_chart) in enumerate(sheet_data['mappings'].items(), 1):
-                calculated_amount = 0
-                calculation_method = "N/A"
-
-                if card_data or transaction_data:
-                    # Determine appropriate values for calculation
-                    card_count = card_data['total_cards'] if card_data else 0
-
-                    # Use dynamic transaction data if available
-                    transaction_count = 0
-                    transaction_amount = 0
-
-                    if transaction_data:
-                        # Choose appropriate transaction data based on fee type
-                        fee_type_lower = fee_type.lower()
-                        if 'international' in fee_type_lower:
-                            transaction_count = transaction_data['international']['total_volume']
-                            transaction_amount = transaction_data['international']['total_amount']
-                        elif 'domestic' in fee_type_lower:
-                            transaction_count = transaction_data['domestic']['total_volume']
-                            transaction_amount = transaction_data['domestic']['total_amount']
-                        elif 'dispute' in fee_type_lower:
-                            transaction_count = transaction_data['disputes']['total_volume']
-                            transaction_amount = transaction_data['disputes']['total_amount']
-                        else:
-                            # Use total values for general fees
-                            transaction_count = transaction_data['all_transactions']['total_volume']
-                            transaction_amount = transaction_data['all_transactions']['total_amount']
-
-                    # Calculate fee based on rate formula and actual data
-                    calc_result = calculate_fee_amount(
-                        rate_chart,
-                        card_count,
-                        transaction_count=transaction_count,
-                        transaction_amount=transaction_amount
-                    )
-                    calculated_amount = calc_result['calculated_amount']
-                    calculation_method = calc_result['calculation_method']
-                    total_calculated_amount += calculated_amount
-
-                    # Determine exchange rate and calculate final amount
-                    currency_symbol = calc_result.get('currency', '$')
-                    exchange_rate = 78 if currency_symbol == '$' else 1  # USD to INR = 78, INR = 1
-
-                    formatted_amount = f"{currency_symbol}{calculated_amount:,.2f}" if calculated_amount > 0 else "N/A"
-                    final_amount = calculated_amount * exchange_rate if calculated_amount > 0 else 0
-                    formatted_final_amount = f"₹{final_amount:,.2f}" if final_amount > 0 else "N/A"
-
-                    # Add to totals
-                    total_final_amount_inr += final_amount
+            if card_data or transaction_data:
+                rows = compute_fee_rows(sheet_data['mappings'], card_data, transaction_data)
+            else:
+                rows = [{'fee_type': fee_type, 'rate_chart': rate_chart,
+                         'calculated_amount': 0, 'calculation_method': 'N/A',
+                         'currency_symbol': '$', 'exchange_rate': None,
+                         'final_amount': 0}
+                        for fee_type, rate_chart in sheet_data['mappings'].items()]
+
+            for i, row in enumerate(rows, 1):
+                calculated_amount = row['calculated_amount']
+                final_amount = row['final_amount']
+                total_calculated_amount += calculated_amount
+                total_final_amount_inr += final_amount
+
+                formatted_amount = (f"{row['currency_symbol']}{calculated_amount:,.2f}"
+                                    if calculated_amount > 0 else "N/A")
+                formatted_final_amount = f"₹{final_amount:,.2f}" if final_amount > 0 else "N/A"
 
                 table_data.append([
                     i,
-                    fee_type,
-                    rate_chart,
-                    calculation_method,
+                    row['fee_type'],
+                    row['rate_chart'],
+                    row['calculation_method'],
                     formatted_amount,
-                    exchange_rate,
+                    row['exchange_rate'],
                     formatted_final_amount
                 ])
                 total_mappings += 1
 
-            # Display table for this sheet
+            # Display table for this sheet; grid drawing walks every cell
+            # twice for widths, so fall back to the simple format on big runs
             headers = ["S.No.", "Fee Type", "Rate Chart", "Calculation Method", "Calculated Amount", "Exchange Rate", "Final Amount (INR)"]
-            print(tabulate(table_data, headers=headers, tablefmt="grid",
+            print(tabulate(table_data, headers=headers,
+                         tablefmt="grid" if len(table_data) <= _GRID_ROW_LIMIT else "simple",
                          maxcolwidths=[5, 25, 30, 40, 15, 12, 15]))
             print()
 
@@ -1204,7 +1550,8 @@ def display_results(analysis_results, card_data=None, transaction_data=None):
             print("SUMMARY - ALL SHEETS")
             print("="*80)
             summary_headers = ["Sheet", "Fee Type", "Rate Chart", "Calculation Method", "Calculated Amount", "Exchange Rate", "Final Amount (INR)"]
-            print(tabulate(all_mappings, headers=summary_headers, tablefmt="grid",
+            print(tabulate(all_mappings, headers=summary_headers,
+                         tablefmt="grid" if len(all_mappings) <= _GRID_ROW_LIMIT else "simple",
                          maxcolwidths=[15, 25, 30, 40, 15, 12, 15]))
             print()
 
@@ -1257,10 +1604,10 @@ def main():
 
     # Extract transaction data from separate files
     transaction_data = {
-        'international': {'total_amount': 0, 'total_volume': 0, 'transactions': []},
-        'domestic': {'total_amount': 0, 'total_volume': 0, 'transactions': []},
-        'disputes': {'total_amount': 0, 'total_volume': 0, 'transactions': []},
-        'all_transactions': {'total_amount': 0, 'total_volume': 0}
+        'international': Bucket(),
+        'domestic': Bucket(),
+        'disputes': Bucket(),
+        'all_transactions': Bucket()
     }
 
     print("\n" + "="*60)
@@ -1286,24 +1633,24 @@ def main():
         )
 
     # Calculate totals
-    transaction_data['all_transactions']['total_amount'] = (
-        transaction_data['international']['total_amount'] +
-        transaction_data['domestic']['total_amount'] +
-        transaction_data['disputes']['total_amount']
+    transaction_data['all_transactions'].total_amount = (
+        transaction_data['international'].total_amount +
+        transaction_data['domestic'].total_amount +
+        transaction_data['disputes'].total_amount
     )
-    transaction_data['all_transactions']['total_volume'] = (
-        transaction_data['international']['total_volume'] +
-        transaction_data['domestic']['total_volume'] +
-        transaction_data['disputes']['total_volume']
+    transaction_data['all_transactions'].total_volume = (
+        transaction_data['international'].total_volume +
+        transaction_data['domestic'].total_volume +
+        transaction_data['disputes'].total_volume
     )
 
     print(f"\nTransaction Processing Summary:")
-    print(f"International: Amount=${transaction_data['international']['total_amount']:,}, Volume={transaction_data['international']['total_volume']}")
-    print(f"Domestic: Amount=${transaction_data['domestic']['total_amount']:,}, Volume={transaction_data['domestic']['total_volume']}")
-    print(f"Disputes: Amount=${transaction_data['disputes']['total_amount']:,}, Volume={transaction_data['disputes']['total_volume']}")
+    print(f"International: Amount=${transaction_data['international'].total_amount:,}, Volume={transaction_data['international'].total_volume}")
+    print(f"Domestic: Amount=${transaction_data['domestic'].total_amount:,}, Volume={transaction_data['domestic'].total_volume}")
+    print(f"Disputes: Amount=${transaction_data['disputes'].total_amount:,}, Volume={transaction_data['disputes'].total_volume}")
 
     # Set to None if no data found
-    if transaction_data['all_transactions']['total_volume'] == 0:
+    if transaction_data['all_transactions'].total_volume == 0:
         print("Warning: No transaction data found")
         transaction_data = None
 
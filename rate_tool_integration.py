@@ -1,35 +1,165 @@
 import os
+import re
 import sys
 import io
+import hashlib
+import pickle
 import tempfile
 import shutil
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stdout
+from functools import lru_cache
+from zipfile import BadZipFile
 from typing import Optional, Dict
 
 from werkzeug.utils import secure_filename
 
 BASE_DIR = os.path.dirname(__file__)
 
-# Use the local rate_tool_app.py file in the same directory
-RATE_APP_FILE = os.path.join(BASE_DIR, 'rate_tool_app.py')
-
-if not os.path.exists(RATE_APP_FILE):
-    raise FileNotFoundError(f"Could not locate rate calculator app.py at: {RATE_APP_FILE}")
-
-module_name = 'rate_tool_app'
-spec = importlib.util.spec_from_file_location(module_name, RATE_APP_FILE)
-rate_tool_app = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(rate_tool_app)
+try:
+    # Normal import goes through the standard importer, which reuses the
+    # cached __pycache__ bytecode instead of re-parsing the source each start
+    import rate_tool_app
+except ImportError:
+    # Fall back to an explicit file load when the tool directory is not on
+    # sys.path (e.g. this module was itself loaded by file path)
+    RATE_APP_FILE = os.path.join(BASE_DIR, 'rate_tool_app.py')
+
+    if not os.path.exists(RATE_APP_FILE):
+        raise FileNotFoundError(f"Could not locate rate calculator app.py at: {RATE_APP_FILE}")
+
+    module_name = 'rate_tool_app'
+    if module_name in sys.modules:
+        # A previous loader already executed the module; reuse it rather
+        # than re-parsing and re-running the whole file
+        rate_tool_app = sys.modules[module_name]
+    else:
+        spec = importlib.util.spec_from_file_location(module_name, RATE_APP_FILE)
+        rate_tool_app = importlib.util.module_from_spec(spec)
+        # Register before exec so repeat importers share this instance
+        sys.modules[module_name] = rate_tool_app
+        spec.loader.exec_module(rate_tool_app)
 
 analyze_excel_structure = rate_tool_app.analyze_excel_structure
 extract_card_issuance_data = rate_tool_app.extract_card_issuance_data
 process_specific_transaction_file = rate_tool_app.process_specific_transaction_file
 calculate_fee_amount = rate_tool_app.calculate_fee_amount
+compute_fee_rows = rate_tool_app.compute_fee_rows
+Bucket = rate_tool_app.Bucket
 
 ALLOWED_EXTENSIONS = {"xls", "xlsx"}
 
 
+# Make the Rust-based calamine Excel engine optional, as processors.py does
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    # Fall back to pandas' default engine
+    CALAMINE_AVAILABLE = False
+
+# Arrow-backed frames keep string columns in native buffers instead of boxed
+# Python objects - use that backend for the cached reads when it's available
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+_READ_KWARGS = {"dtype_backend": "pyarrow"} if PYARROW_AVAILABLE else {}
+
+
+# What a failed workbook open/read can raise: missing or unreadable files,
+# formats pandas can't determine, corrupt xlsx archives, absent engines
+_EXCEL_READ_ERRORS = (OSError, ValueError, ImportError, BadZipFile)
+
+
+def _excel_sig(path):
+    """Cache key component that changes whenever the file on disk does"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _open_excel(path, sig):
+    """Parse a workbook once per (path, signature) and reuse the handle -
+    the invoice scan walks the same uploads the analyzers already opened"""
+    import pandas as pd
+    if CALAMINE_AVAILABLE:
+        return pd.ExcelFile(path, engine="calamine")
+    return pd.ExcelFile(path)
+
+
+@lru_cache(maxsize=32)
+def _read_sheet(path, sig, sheet_name):
+    """Memoized sheet read; callers treat the returned frame as read-only"""
+    import pandas as pd
+    return pd.read_excel(_open_excel(path, sig), sheet_name=sheet_name,
+                         **_READ_KWARGS)
+
+
+def _find_invoice_header(path, sheet_name, max_rows=50):
+    """Locate the Particulars/last-Amount header by streaming cell values
+
+    openpyxl's read-only mode materializes only the rows scanned, so this
+    touches a handful of cells instead of parsing the sheet. Returns
+    (header_row_idx, fee_col_idx, amt_col_idx) or None when no header shows
+    up in the first max_rows rows.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        for i, row in enumerate(ws.iter_rows(max_row=max_rows, values_only=True)):
+            lowered = ['' if v is None else str(v).strip().lower() for v in row]
+            if 'particulars' in lowered:
+                amount_cols = [j for j, v in enumerate(lowered) if v == 'amount']
+                if amount_cols:
+                    return i, lowered.index('particulars'), amount_cols[-1]
+        return None
+    finally:
+        wb.close()
+
+
+@lru_cache(maxsize=32)
+def _read_invoice_sheet(path, sig, sheet_name):
+    """Read an invoice-like sheet, narrowed to its fee/amount columns
+
+    A streamed header scan locates the Particulars/Amount labels; when found,
+    the real read pulls only those two columns instead of materializing every
+    cell. Layouts the scan doesn't recognize - and legacy .xls files, which
+    openpyxl cannot stream - fall back to the plain cached whole-sheet read.
+    """
+    import pandas as pd
+
+    if path.lower().endswith('.xlsx'):
+        found = _find_invoice_header(path, sheet_name)
+        if found is not None:
+            header_row_idx, j_p, j_a = found
+            return pd.read_excel(_open_excel(path, sig), sheet_name=sheet_name,
+                                 header=None, skiprows=header_row_idx,
+                                 usecols=sorted({j_p, j_a}), dtype=str)
+
+    return _read_sheet(path, sig, sheet_name)
+
+
+def clear_excel_cache():
+    """Drop the cached workbooks, e.g. between unrelated analysis runs"""
+    _read_invoice_sheet.cache_clear()
+    _read_sheet.cache_clear()
+    _open_excel.cache_clear()
+
+
+class _DiscardIO(io.TextIOBase):
+    """stdout sink for the analyzers' diagnostic prints - unlike StringIO it
+    drops the text instead of growing a buffer nobody reads"""
+
+    def write(self, s):
+        return len(s)
+
+
 def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -47,12 +177,14 @@ def save_uploaded_file(file_storage, base_dir: str) -> Optional[str]:
     return file_path
 
 
+# Display template per currency symbol; anything unrecognised renders as USD
+_CURRENCY_FMT = {"$": "USD {:,.2f}", "Rs": "INR {:,.2f}"}
+
+
 def format_currency(amount, currency_symbol):
-    if amount is None or amount == 0:
+    if not amount:
         return "N/A"
-    if currency_symbol == "Rs":
-        return f"INR {amount:,.2f}"
-    return f"USD {amount:,.2f}"
+    return _CURRENCY_FMT.get(currency_symbol, _CURRENCY_FMT["$"]).format(amount)
 
 
 def extract_invoice_data_dynamically(file_paths):
@@ -61,55 +193,96 @@ def extract_invoice_data_dynamically(file_paths):
     """
     invoice_data = {}
 
-    # Check multiple possible invoice sources
-    possible_invoice_paths = [
-        file_paths.get('invoice'),  # Dedicated invoice file (if provided)
-        file_paths.get('summary'),  # Could contain invoice sheet
-        file_paths.get('card'),     # Could contain invoice data
-        file_paths.get('international'),  # Could contain invoice data
-        file_paths.get('domestic'),      # Could contain invoice data
-        file_paths.get('dispute')        # Could contain invoice data
-    ]
+    # Check multiple possible invoice sources - the dedicated invoice file
+    # first, deduped because several upload fields can name the same file
+    possible_invoice_paths = dict.fromkeys(
+        path for path in (
+            file_paths.get('invoice'),  # Dedicated invoice file (if provided)
+            file_paths.get('summary'),  # Could contain invoice sheet
+            file_paths.get('card'),     # Could contain invoice data
+            file_paths.get('international'),
+            file_paths.get('domestic'),
+            file_paths.get('dispute')
+        ) if path
+    )
 
     for file_path in possible_invoice_paths:
-        if not file_path:
-            continue
-
+        # Only the I/O sits inside try blocks; the scan logic itself should
+        # never raise and shouldn't hide bugs behind a broad handler
         try:
-            import pandas as pd
-            excel_file = pd.ExcelFile(file_path)
-
-            # Look for invoice-related sheets
-            for sheet_name in excel_file.sheet_names:
-                sheet_name_lower = sheet_name.lower()
-                if 'invoice' in sheet_name_lower or 'bill' in sheet_name_lower:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    invoice_data.update(extract_invoice_from_sheet(df, sheet_name))
-
-            # Also check if main sheet has invoice-like data
-            if not invoice_data:
-                df = pd.read_excel(file_path, sheet_name=excel_file.sheet_names[0])
-                potential_invoice = extract_invoice_from_sheet(df, excel_file.sheet_names[0])
-                if potential_invoice:
-                    invoice_data.update(potential_invoice)
-
-        except Exception:
+            sig = _excel_sig(file_path)
+            excel_file = _open_excel(file_path, sig)
+        except _EXCEL_READ_ERRORS:
             continue
 
+        # Look for invoice-related sheets
+        for sheet_name in excel_file.sheet_names:
+            sheet_name_lower = sheet_name.lower()
+            if 'invoice' in sheet_name_lower or 'bill' in sheet_name_lower:
+                try:
+                    df = _read_invoice_sheet(file_path, sig, sheet_name)
+                except _EXCEL_READ_ERRORS:
+                    continue
+                invoice_data.update(extract_invoice_from_sheet(df, sheet_name))
+
+        # Also check if main sheet has invoice-like data
+        if not invoice_data and excel_file.sheet_names:
+            main_sheet = excel_file.sheet_names[0]
+            try:
+                df = _read_invoice_sheet(file_path, sig, main_sheet)
+            except _EXCEL_READ_ERRORS:
+                continue
+            invoice_data.update(extract_invoice_from_sheet(df, main_sheet))
+
+        if invoice_data:
+            # Found a populated invoice; don't parse the remaining candidates
+            break
+
     return invoice_data
 
+def _harvest_invoice_columns(strs, str_lo, notna, j_fee, j_amt, start_row=0,
+                             skip_labels=('particulars', 'fee type', 's.no', 'sno',
+                                          'description', 'amount')):
+    """Pull fee-name/amount pairs from two columns of the stringified arrays
+
+    Runs the validity checks as whole-column masks instead of per-row Python.
+    """
+    import pandas as pd
+    import numpy as np
+
+    fee_vals = strs[start_row:, j_fee]
+    if fee_vals.size == 0:
+        return {}
+    amt_clean = np.char.replace(strs[start_row:, j_amt], ',', '')
+    amounts = pd.to_numeric(pd.Series(amt_clean), errors='coerce').to_numpy()
+    valid = (notna[start_row:, j_fee] & notna[start_row:, j_amt]
+             & (fee_vals != '')
+             & ~np.isin(np.char.lower(fee_vals), skip_labels)
+             & ~np.isnan(amounts) & (amounts >= 0))
+    return {fee: float(amt) for fee, amt in zip(fee_vals[valid], amounts[valid])}
+
+
 def extract_invoice_from_sheet(df, sheet_name):
     """
     Extract invoice data from any sheet dynamically
     """
     import pandas as pd
+    import numpy as np
 
     invoice_items = {}
 
+    if df.empty:
+        return invoice_items
+
     # Look for patterns that indicate invoice data
     invoice_keywords = ['particulars', 'fee', 'charge', 'amount', 'total', 'description']
     amount_keywords = ['amount', 'value', 'cost', 'price', 'total']
 
+    # Stringified cell arrays shared by all three detection strategies
+    notna = df.notna().to_numpy()
+    strs = np.char.strip(df.to_numpy(dtype=str))
+    str_lo = np.char.lower(strs)
+
     # Find columns that might contain fee descriptions and amounts
     fee_col = None
     amount_col = None
@@ -127,132 +300,109 @@ def extract_invoice_from_sheet(df, sheet_name):
 
     # If no clear columns found, try positional approach
     if not fee_col or not amount_col:
-        for idx, row in df.iterrows():
-            row_values = [str(val).strip() for val in row if pd.notna(val)]
-
-            # Look for header row
-            if any(keyword in ' '.join(row_values).lower() for keyword in invoice_keywords):
-                # Found potential header, extract data from subsequent rows
-                for data_idx in range(idx + 1, len(df)):
-                    data_row = df.iloc[data_idx]
-                    row_data = [str(val).strip() for val in data_row if pd.notna(val) and str(val).strip()]
-
-                    if len(row_data) >= 2:
-                        # First non-empty value is likely fee name, last is likely amount
-                        fee_name = row_data[0]
-                        amount_value = row_data[-1]
-
-                        # Skip header-like rows
-                        if fee_name.lower() in ['particulars', 'fee type', 's.no', 'sno']:
-                            continue
-
-                        # Try to parse amount
-                        try:
-                            if amount_value.replace(',', '').replace('.', '').isdigit():
-                                amount = float(amount_value.replace(',', ''))
-                                invoice_items[fee_name] = amount
-                        except:
-                            continue
-                break
+        # One mask pass finds the first row mentioning any invoice keyword
+        kw_mask = np.zeros(str_lo.shape, dtype=bool)
+        for keyword in invoice_keywords:
+            kw_mask |= np.char.find(str_lo, keyword) >= 0
+        header_rows = np.nonzero(kw_mask.any(axis=1))[0]
+
+        if header_rows.size:
+            present = notna & (strs != '')
+            for data_idx in range(header_rows[0] + 1, len(df)):
+                row_data = strs[data_idx][present[data_idx]]
+
+                if len(row_data) >= 2:
+                    # First non-empty value is likely fee name, last is likely amount
+                    fee_name = row_data[0]
+                    amount_value = row_data[-1]
+
+                    # Skip header-like rows
+                    if fee_name.lower() in ['particulars', 'fee type', 's.no', 'sno']:
+                        continue
+
+                    # Parse the amount with the same coerce-and-mask contract
+                    # as the column harvester - no per-cell exception handling
+                    amount = pd.to_numeric(amount_value.replace(',', ''), errors='coerce')
+                    if pd.notna(amount) and amount >= 0:
+                        invoice_items[fee_name] = float(amount)
 
     # Extract using identified columns
     if fee_col is not None and amount_col is not None:
-        for idx, row in df.iterrows():
-            fee_name = row[fee_col]
-            amount_value = row[amount_col]
-
-            if pd.notna(fee_name) and pd.notna(amount_value):
-                fee_name_str = str(fee_name).strip()
-
-                # Skip header rows
-                if fee_name_str.lower() in ['particulars', 'fee type', 's.no', 'sno', 'description', 'amount']:
-                    continue
-
-                # Try to parse amount
-                try:
-                    amount_str = str(amount_value).replace(',', '')
-                    if amount_str.replace('.', '').isdigit():
-                        amount = float(amount_str)
-                        invoice_items[fee_name_str] = amount
-                except:
-                    continue
+        invoice_items.update(_harvest_invoice_columns(
+            strs, str_lo, notna,
+            df.columns.get_loc(fee_col), df.columns.get_loc(amount_col)))
 
     # If no items found using column approach, try fallback method with content-based detection
     if not invoice_items:
-        # Look for header row with "Particulars" to identify structure
-        particulars_col = None
-        final_amount_col = None
-        header_row_idx = None
-
-        # Find header row and columns by scanning content
-        for idx, row in df.iterrows():
-            row_values = [str(val).strip().lower() if pd.notna(val) else "" for val in row]
-
-            # Check if this row contains "Particulars" (header row)
-            for col_idx, val in enumerate(row_values):
-                if val == 'particulars':
-                    particulars_col = df.columns[col_idx]
-                    header_row_idx = idx
-
-                    # Look for the last "Amount" column in the same row (final amount after exchange rate)
-                    for end_col_idx in range(len(row_values) - 1, -1, -1):
-                        if row_values[end_col_idx] == 'amount':
-                            final_amount_col = df.columns[end_col_idx]
-                            break
-                    break
-
-            if particulars_col and final_amount_col:
-                break
+        # Look for the first row holding both a "Particulars" label and an
+        # "Amount" label; the last Amount column is the post-exchange figure
+        p_mask = str_lo == 'particulars'
+        a_mask = str_lo == 'amount'
+        header_rows = np.nonzero(p_mask.any(axis=1) & a_mask.any(axis=1))[0]
+
+        if header_rows.size:
+            header_row_idx = header_rows[0]
+            particulars_col = int(np.argmax(p_mask[header_row_idx]))
+            final_amount_col = int(np.nonzero(a_mask[header_row_idx])[0][-1])
+            invoice_items = _harvest_invoice_columns(
+                strs, str_lo, notna, particulars_col, final_amount_col,
+                start_row=header_row_idx + 1)
 
-        # Extract data if we found the structure
-        if particulars_col and final_amount_col and header_row_idx is not None:
-            # Process rows after the header
-            for idx in range(header_row_idx + 1, len(df)):
-                row = df.iloc[idx]
-                fee_name = row[particulars_col]
-                amount_value = row[final_amount_col]
-
-                if pd.notna(fee_name) and pd.notna(amount_value):
-                    fee_name_str = str(fee_name).strip()
-
-                    # Skip empty rows and total rows
-                    if fee_name_str == '' or amount_value == '' or pd.isna(amount_value):
-                        continue
+    return invoice_items
 
-                    # Try to parse amount
-                    try:
-                        if isinstance(amount_value, (int, float)):
-                            amount = float(amount_value)
-                            invoice_items[fee_name_str] = amount
-                        else:
-                            amount_str = str(amount_value).replace(',', '')
-                            if amount_str.replace('.', '').isdigit():
-                                amount = float(amount_str)
-                                invoice_items[fee_name_str] = amount
-                    except:
-                        continue
+# rapidfuzz scores the whole similarity matrix in native code; the pure-Python
+# Jaccard loop below stays as the fallback when it isn't installed
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# scipy turns the score matrix into a globally-optimal one-to-one assignment;
+# without it the greedy per-fee pick below stands
+try:
+    from scipy.optimize import linear_sum_assignment as _linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Fee-label normalization, compiled once instead of on every comparison
+_STOP_RE = re.compile(r'\b(fee|charge|cost|amount|total|value)\b')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def normalize_fee_name(name):
+    """Lower-case a fee label and strip filler words, punctuation and
+    repeated whitespace
+
+    Cached - the same labels recur across sheets and result builds.
+    """
+    name = _STOP_RE.sub('', name.lower())
+    name = _PUNCT_RE.sub('', name)
+    return _WS_RE.sub(' ', name).strip()
 
-    return invoice_items
 
-def fuzzy_match_fee_types(calculated_fees, invoice_fees):
+def fuzzy_match_fee_types(calculated_fees, invoice_fees, invoice_norm=None):
     """
     Match fee types between calculated and invoice data using fuzzy matching
-    """
-    import re
 
+    Callers matching the same invoice against many sheets can pass a
+    prenormalized invoice_norm mapping to skip redoing that side each time.
+    """
     matches = {}
 
-    def normalize_fee_name(name):
-        # Remove common words and normalize
-        name = re.sub(r'\b(fee|charge|cost|amount|total|value)\b', '', name.lower())
-        name = re.sub(r'[^\w\s]', '', name)  # Remove special characters
-        name = re.sub(r'\s+', ' ', name).strip()  # Normalize whitespace
-        return name
+    # Normalize every label exactly once; the pairwise loops below reuse the
+    # cached strings and word-sets instead of re-running the regexes per pair
+    calc_norm = {fee: normalize_fee_name(fee) for fee in calculated_fees}
+    if invoice_norm is None:
+        invoice_norm = {fee: normalize_fee_name(fee) for fee in invoice_fees}
 
     # Try exact matches first
-    for calc_fee in calculated_fees:
-        for invoice_fee in invoice_fees:
-            if normalize_fee_name(calc_fee) == normalize_fee_name(invoice_fee):
+    for calc_fee, calc_normalized in calc_norm.items():
+        for invoice_fee, invoice_normalized in invoice_norm.items():
+            if calc_normalized == invoice_normalized:
                 matches[calc_fee] = invoice_fee
                 break
 
@@ -260,18 +410,38 @@ def fuzzy_match_fee_types(calculated_fees, invoice_fees):
     unmatched_calc = [f for f in calculated_fees if f not in matches]
     unmatched_invoice = [f for f in invoice_fees if f not in matches.values()]
 
+    if RAPIDFUZZ_AVAILABLE and unmatched_calc and unmatched_invoice:
+        # One C-level pass over the whole score matrix, then a greedy pick
+        # per calculated fee above the same kind of 30% match threshold
+        scores = _rf_process.cdist(
+            [calc_norm[f] for f in unmatched_calc],
+            [invoice_norm[f] for f in unmatched_invoice],
+            scorer=_rf_fuzz.token_set_ratio)
+        if SCIPY_AVAILABLE:
+            # Hungarian assignment: maximizes the total score and keeps the
+            # pairing one-to-one, unlike the greedy pick
+            rows, cols = _linear_sum_assignment(scores, maximize=True)
+            for ri, ci in zip(rows, cols):
+                if scores[ri][ci] > 30:
+                    matches[unmatched_calc[ri]] = unmatched_invoice[ci]
+        else:
+            for row, calc_fee in enumerate(unmatched_calc):
+                best = int(scores[row].argmax())
+                if scores[row][best] > 30:
+                    matches[calc_fee] = unmatched_invoice[best]
+        return matches
+
+    invoice_words_by_fee = {f: set(invoice_norm[f].split()) for f in unmatched_invoice}
+
     for calc_fee in unmatched_calc:
-        calc_normalized = normalize_fee_name(calc_fee)
+        calc_words = set(calc_norm[calc_fee].split())
         best_match = None
         best_score = 0
 
         for invoice_fee in unmatched_invoice:
-            invoice_normalized = normalize_fee_name(invoice_fee)
-
-            # Calculate similarity
-            calc_words = set(calc_normalized.split())
-            invoice_words = set(invoice_normalized.split())
+            invoice_words = invoice_words_by_fee[invoice_fee]
 
+            # Jaccard similarity on the precomputed word-sets
             if calc_words and invoice_words:
                 intersection = len(calc_words.intersection(invoice_words))
                 union = len(calc_words.union(invoice_words))
@@ -287,6 +457,9 @@ def fuzzy_match_fee_types(calculated_fees, invoice_fees):
     return matches
 
 def build_result_context(analysis_results, card_data, transaction_data, warnings, invoice_data=None):
+    # Local binds skip the global + attribute lookups in the per-row loops
+    _fmt_inr = _CURRENCY_FMT["Rs"].format
+    _fmt_usd = _CURRENCY_FMT["$"].format
     context = {
         "has_data": bool(analysis_results and analysis_results.get("mappings")),
         "summary": {
@@ -308,6 +481,12 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
     total_final_amount_inr = 0.0
     total_mappings = 0
 
+    # The invoice side never changes across sheets - list and normalize it
+    # once here instead of once per sheet inside the loop
+    invoice_keys = list(invoice_data.keys()) if invoice_data else []
+    invoice_items = tuple(invoice_data.items()) if invoice_data else ()
+    invoice_norm = {key: normalize_fee_name(key) for key in invoice_keys}
+
     sheets_presentations = []
 
     for sheet_name, sheet_data in analysis_results["mappings"].items():
@@ -316,43 +495,18 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
         if not mappings:
             continue
 
-        # Build calculated fees
+        # Build calculated fees from the shared per-sheet computation
         calculated_fees = {}
-        for fee_type, rate_chart in mappings.items():
-            card_count = card_data["total_cards"] if card_data else 0
-            transaction_count = 0
-            transaction_amount = 0
-
-            if transaction_data:
-                fee_type_lower = fee_type.lower()
-                if "international" in fee_type_lower:
-                    trans_bucket = transaction_data.get("international", {})
-                elif "domestic" in fee_type_lower:
-                    trans_bucket = transaction_data.get("domestic", {})
-                elif "dispute" in fee_type_lower:
-                    trans_bucket = transaction_data.get("disputes", {})
-                else:
-                    trans_bucket = transaction_data.get("all_transactions", {})
-
-                transaction_count = trans_bucket.get("total_volume", 0)
-                transaction_amount = trans_bucket.get("total_amount", 0)
-
-            calc_result = calculate_fee_amount(
-                rate_chart,
-                card_count,
-                transaction_count=transaction_count,
-                transaction_amount=transaction_amount
-            )
-
-            calculated_amount = calc_result.get("calculated_amount", 0)
-            calculation_method = calc_result.get("calculation_method", "N/A")
-            currency_symbol = calc_result.get("currency", "$") or "$"
-            exchange_rate = 78 if currency_symbol == "$" else 1
+        for calc_row in compute_fee_rows(mappings, card_data, transaction_data):
+            fee_type = calc_row["fee_type"]
+            calculated_amount = calc_row["calculated_amount"]
+            currency_symbol = calc_row["currency_symbol"] or "$"
+            exchange_rate = calc_row["exchange_rate"]
 
             if calculated_amount and calculated_amount > 0:
-                formatted_amount = format_currency(calculated_amount, "Rs" if currency_symbol == "Rs" else "$")
-                final_amount = calculated_amount * exchange_rate
-                final_amount_display = f"INR {final_amount:,.2f}"
+                formatted_amount = format_currency(calculated_amount, currency_symbol)
+                final_amount = calc_row["final_amount"]
+                final_amount_display = _fmt_inr(final_amount)
                 total_final_amount_inr += final_amount
             else:
                 formatted_amount = "N/A"
@@ -360,8 +514,8 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
                 final_amount_display = "N/A"
 
             calculated_fees[fee_type] = {
-                "rate_chart": rate_chart,
-                "calculation_method": calculation_method,
+                "rate_chart": calc_row["rate_chart"],
+                "calculation_method": calc_row["calculation_method"],
                 "calculated_amount": calculated_amount,
                 "calculated_amount_display": formatted_amount,
                 "exchange_rate": exchange_rate if calculated_amount else None,
@@ -372,14 +526,10 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
 
         # Merge calculated fees with invoice data
         if calculated_fees or invoice_data:
-            # Get the union of all fee types
-            all_fee_types = set(calculated_fees.keys() if calculated_fees else [])
-            if invoice_data:
-                all_fee_types.update(invoice_data.keys())
-
             # Match calculated and invoice fees using fuzzy matching
             if calculated_fees and invoice_data:
-                fee_matches = fuzzy_match_fee_types(list(calculated_fees.keys()), list(invoice_data.keys()))
+                fee_matches = fuzzy_match_fee_types(list(calculated_fees.keys()),
+                                                    invoice_keys, invoice_norm)
             else:
                 fee_matches = {}
 
@@ -395,7 +545,7 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
                 matched_invoice_fee = fee_matches.get(fee_type)
                 if matched_invoice_fee:
                     visa_amount = invoice_data.get(matched_invoice_fee, 0)
-                    visa_amount_display = f"INR {visa_amount:,.2f}" if visa_amount else "N/A"
+                    visa_amount_display = _fmt_inr(visa_amount) if visa_amount else "N/A"
                     processed_invoice_items.add(matched_invoice_fee)
                 else:
                     visa_amount = None
@@ -417,12 +567,12 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
                     if abs(percentage_diff) < 0.01:  # Less than 0.01%
                         percentage_diff_display = "0.00%"
                         diff_status = "exact"
-                    elif percentage_diff > 0:
-                        percentage_diff_display = f"+{percentage_diff:.2f}%"
-                        diff_status = "higher"
                     else:
-                        percentage_diff_display = f"{percentage_diff:.2f}%"
-                        diff_status = "lower"
+                        # One format call covers both signs; '+' only needs
+                        # prepending since negatives carry their own sign
+                        sign = "+" if percentage_diff > 0 else ""
+                        percentage_diff_display = f"{sign}{percentage_diff:.2f}%"
+                        diff_status = "higher" if percentage_diff > 0 else "lower"
                 elif calc_data["final_amount"] is None or calc_data["final_amount_display"] == "Missing":
                     percentage_diff_display = "Missing"
                     diff_status = "missing"
@@ -447,26 +597,25 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
                     "diff_status": diff_status
                 })
 
-            # Process unmatched invoice items
-            if invoice_data:
-                for invoice_fee, invoice_amount in invoice_data.items():
-                    if invoice_fee not in processed_invoice_items:
-                        unified_rows.append({
-                            "fee_type": invoice_fee,
-                            "rate_chart": "N/A",
-                            "calculation_method": "N/A",
-                            "calculated_amount": 0,
-                            "calculated_amount_display": "N/A",
-                            "exchange_rate": None,
-                            "final_amount": None,
-                            "final_amount_display": "Missing",
-                            "currency_symbol": "INR",
-                            "visa_amount": invoice_amount,
-                            "visa_amount_display": f"INR {invoice_amount:,.2f}",
-                            "percentage_diff": None,
-                            "percentage_diff_display": "Missing",
-                            "diff_status": "missing"
-                        })
+            # Process unmatched invoice items from the hoisted snapshot
+            for invoice_fee, invoice_amount in invoice_items:
+                if invoice_fee not in processed_invoice_items:
+                    unified_rows.append({
+                        "fee_type": invoice_fee,
+                        "rate_chart": "N/A",
+                        "calculation_method": "N/A",
+                        "calculated_amount": 0,
+                        "calculated_amount_display": "N/A",
+                        "exchange_rate": None,
+                        "final_amount": None,
+                        "final_amount_display": "Missing",
+                        "currency_symbol": "INR",
+                        "visa_amount": invoice_amount,
+                        "visa_amount_display": _fmt_inr(invoice_amount),
+                        "percentage_diff": None,
+                        "percentage_diff_display": "Missing",
+                        "diff_status": "missing"
+                    })
 
             if unified_rows:
                 sheets_presentations.append({
@@ -540,9 +689,9 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
         "sheet_count": sheet_count,
         "total_mappings": total_mappings,
         "total_final_amount_inr": total_final_amount_inr,
-        "total_final_amount_display": f"INR {total_final_amount_inr:,.2f}" if total_final_amount_inr else "N/A",
+        "total_final_amount_display": _fmt_inr(total_final_amount_inr) if total_final_amount_inr else "N/A",
         "total_visa_amount_inr": total_visa_amount_inr,
-        "total_visa_amount_display": f"INR {total_visa_amount_inr:,.2f}" if total_visa_amount_inr else "N/A",
+        "total_visa_amount_display": _fmt_inr(total_visa_amount_inr) if total_visa_amount_inr else "N/A",
         "total_visa_items": total_visa_items,
         "total_calculated_items": total_calculated_items,
         "matched_items": matched_items,
@@ -570,15 +719,15 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
             ("all_transactions", "All Transactions")
         ):
             bucket = transaction_data.get(key)
-            if not bucket:
+            if bucket is None:
                 continue
-            if bucket.get("total_volume", 0) == 0 and bucket.get("total_amount", 0) == 0 and key != "all_transactions":
+            if bucket.total_volume == 0 and bucket.total_amount == 0 and key != "all_transactions":
                 continue
             transaction_cards.append({
                 "label": label,
-                "amount": bucket.get("total_amount", 0),
-                "amount_display": f"USD {bucket.get('total_amount', 0):,.2f}" if bucket.get("total_amount", 0) else "N/A",
-                "volume": bucket.get("total_volume", 0)
+                "amount": bucket.total_amount,
+                "amount_display": _fmt_usd(bucket.total_amount) if bucket.total_amount else "N/A",
+                "volume": bucket.total_volume
             })
 
         if transaction_cards:
@@ -589,10 +738,45 @@ def build_result_context(analysis_results, card_data, transaction_data, warnings
     return context
 
 
+# Analysis results cached by upload content - re-submitting the same files
+# skips the parse entirely. Set RATE_TOOL_NO_CACHE=1 to disable.
+_RUN_CACHE_DIR = os.path.join(BASE_DIR, ".reconcile_cache")
+
+
+def _run_cache_path(file_paths):
+    """Cache location derived from the roles and bytes of the uploads"""
+    digest = hashlib.sha1()
+    for key in sorted(k for k, p in file_paths.items() if p):
+        digest.update(key.encode())
+        with open(file_paths[key], "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return os.path.join(_RUN_CACHE_DIR, f"{digest.hexdigest()}.pkl")
+
+
 def run_rate_analysis(file_paths: Dict[str, Optional[str]]):
     warnings = []
 
-    with redirect_stdout(io.StringIO()):
+    # Uploads live in a per-request temp dir, so entries from earlier runs
+    # can never hit again - drop them up front
+    clear_excel_cache()
+
+    cache_path = None
+    if os.environ.get("RATE_TOOL_NO_CACHE") != "1":
+        try:
+            cache_path = _run_cache_path(file_paths)
+            with open(cache_path, "rb") as f:
+                (analysis_results, card_data, transaction_data,
+                 warnings, invoice_data) = pickle.load(f)
+            return build_result_context(analysis_results, card_data,
+                                        transaction_data, warnings, invoice_data)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.PickleError, ValueError, EOFError):
+            # Unreadable cache entry - fall through and recompute
+            pass
+
+    with redirect_stdout(_DiscardIO()):
         analysis_results = analyze_excel_structure(file_paths.get('summary'))
 
         card_data = None
@@ -603,39 +787,39 @@ def run_rate_analysis(file_paths: Dict[str, Optional[str]]):
                 card_data = None
 
         transaction_data = {
-            "international": {"total_amount": 0, "total_volume": 0, "transactions": []},
-            "domestic": {"total_amount": 0, "total_volume": 0, "transactions": []},
-            "disputes": {"total_amount": 0, "total_volume": 0, "transactions": []},
-            "all_transactions": {"total_amount": 0, "total_volume": 0}
+            "international": Bucket(),
+            "domestic": Bucket(),
+            "disputes": Bucket(),
+            "all_transactions": Bucket()
         }
 
-        if file_paths.get('international'):
-            transaction_data["international"] = process_specific_transaction_file(
-                file_paths['international'], "international"
-            )
-
-        if file_paths.get('domestic'):
-            transaction_data["domestic"] = process_specific_transaction_file(
-                file_paths['domestic'], "domestic"
-            )
-
-        if file_paths.get('dispute'):
-            transaction_data["disputes"] = process_specific_transaction_file(
-                file_paths['dispute'], "disputes"
-            )
-
-        transaction_data["all_transactions"]["total_amount"] = (
-            transaction_data["international"]["total_amount"] +
-            transaction_data["domestic"]["total_amount"] +
-            transaction_data["disputes"]["total_amount"]
+        # The three transaction files are independent - parse them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                bucket: executor.submit(process_specific_transaction_file,
+                                        file_paths[key], expected_type)
+                for key, expected_type, bucket in (
+                    ('international', 'international', 'international'),
+                    ('domestic', 'domestic', 'domestic'),
+                    ('dispute', 'disputes', 'disputes')
+                )
+                if file_paths.get(key)
+            }
+            for bucket, future in futures.items():
+                transaction_data[bucket] = future.result()
+
+        transaction_data["all_transactions"].total_amount = (
+            transaction_data["international"].total_amount +
+            transaction_data["domestic"].total_amount +
+            transaction_data["disputes"].total_amount
         )
-        transaction_data["all_transactions"]["total_volume"] = (
-            transaction_data["international"]["total_volume"] +
-            transaction_data["domestic"]["total_volume"] +
-            transaction_data["disputes"]["total_volume"]
+        transaction_data["all_transactions"].total_volume = (
+            transaction_data["international"].total_volume +
+            transaction_data["domestic"].total_volume +
+            transaction_data["disputes"].total_volume
         )
 
-        if transaction_data["all_transactions"]["total_volume"] == 0:
+        if transaction_data["all_transactions"].total_volume == 0:
             warnings.append("No transaction data found.")
             transaction_data = None
 
@@ -647,6 +831,16 @@ def run_rate_analysis(file_paths: Dict[str, Optional[str]]):
             else:
                 warnings.append("No invoice data found in uploaded files. Please check the invoice file format.")
 
+    if cache_path:
+        try:
+            os.makedirs(_RUN_CACHE_DIR, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                pickle.dump((analysis_results, card_data, transaction_data,
+                             warnings, invoice_data), f)
+        except OSError:
+            # Caching is best-effort; the analysis result still stands
+            pass
+
     report_context = build_result_context(analysis_results, card_data, transaction_data, warnings, invoice_data)
     return report_context
 
@@ -1,101 +1,232 @@
+import numpy as np
+import os
 import pandas as pd
 import re
+from functools import lru_cache
+
+# Make python-calamine optional - its Rust reader parses workbooks several
+# times faster than openpyxl when the package is installed
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+def _file_sig(path):
+    """Cheap change-detection key: reparse only when a file's mtime or size moves."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
 
 # Excel extraction function (from phase3_test.py)
 def extract_values(file_path):
-    # Read Excel file
-    df = pd.read_excel(file_path)
+    # Repeat extractions of an unchanged file come straight from the cache;
+    # streams and other file-like uploads take the uncached path
+    if isinstance(file_path, (str, os.PathLike)):
+        return _extract_values_cached(os.fspath(file_path), _file_sig(file_path))
+    return _extract_values(file_path)
 
-    # Clean column names
-    df.columns = [col.strip() for col in df.columns]
+@lru_cache(maxsize=32)
+def _extract_values_cached(path, sig):
+    return _extract_values(path)
 
-    # Clean row labels (first column)
-    df.iloc[:, 0] = df.iloc[:, 0].astype(str).str.strip()
+def _cents(value) -> int:
+    """Quantize one cell value to int cents; blanks and junk count as zero."""
+    if value is None:
+        return 0
+    try:
+        return int(round(float(value) * 100))
+    except (TypeError, ValueError):
+        return 0
 
-    extracted = {}
+def _extract_values_streamed(file_path):
+    """Stream an .xlsx sheet row by row with read-only openpyxl.
 
-    # Iterate over all rows
-    for idx, row in df.iterrows():
-        label = row.iloc[0]   # first column = label (e.g., Interchange, Reimbursement, etc.)
-        
-        # Replace NaN or "nan" with "Total"
-        if pd.isna(label) or label.lower() == "nan":
-            label = "Total"
-        
-        dr = row["DR"]
-        cr = row["CR"]
-        net = row["Net"]
+    Keeps the working set at one row regardless of sheet size and skips the
+    DataFrame materialization entirely - used when calamine is not around to
+    make the pandas path cheap.
+    """
+    from openpyxl import load_workbook
 
-        extracted[label] = {
-            "DR": dr,
-            "CR": cr,
-            "Net": net
-        }
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [h.strip() if isinstance(h, str) else h for h in next(rows, ())]
+        cols = [(field, header.index(field)) for field in ("DR", "CR", "Net")]
+
+        extracted = {}
+        for row in rows:
+            label = str(row[0]).strip() if row and row[0] is not None else "nan"
+            if label.lower() == "nan":
+                label = "Total"
+            extracted[label] = {
+                field: _cents(row[i]) if i < len(row) else 0 for field, i in cols
+            }
+        return extracted
+    finally:
+        wb.close()
+
+def _extract_values(file_path):
+    # Stream .xlsx paths when the fast calamine reader is absent; .xls files
+    # and file-like uploads stay on pandas
+    if not CALAMINE_AVAILABLE and isinstance(file_path, (str, os.PathLike)) \
+            and os.fspath(file_path).lower().endswith(".xlsx"):
+        return _extract_values_streamed(file_path)
+
+    # Read Excel file
+    if CALAMINE_AVAILABLE:
+        df = pd.read_excel(file_path, engine="calamine")
+    else:
+        df = pd.read_excel(file_path)
 
-    return extracted
+    # Clean column names in one vectorized pass instead of a Python list comp
+    df.columns = df.columns.str.strip()
+
+    # Clean row labels (first column); NaN or "nan" labels become "Total"
+    labels = df.iloc[:, 0].astype(str).str.strip()
+    labels = labels.mask(labels.isna() | (labels.str.lower() == "nan"), "Total")
+
+    # Build the whole mapping in one pandas pass instead of a Python row loop.
+    # to_dict refuses duplicate index entries, so keep the last row per label -
+    # the same last-write-wins the dict assignment loop had.
+    values = df[["DR", "CR", "Net"]].set_axis(labels)
+    values = values[~values.index.duplicated(keep="last")]
+
+    # Quantize amounts to int64 cents - the inputs carry exactly two decimal
+    # places, so integers hold them exactly and compare without FP noise.
+    # Blank and non-numeric cells count as zero, matching the streamed
+    # path's _cents.
+    values = values.apply(pd.to_numeric, errors="coerce")
+    values = (values * 100).round().fillna(0).astype("int64")
+    return values.to_dict(orient="index")
 
 # TXT extraction functions (from txt.py)
-def parse_amount(value: str) -> float:
-    """Convert amounts like '1,540,000.00DB' or '1,500.00CR' into signed floats."""
+
+# Compiled once at import - the per-line loop reuses them instead of paying
+# re-module cache lookups on every call.
+# _LINE_RE splits a line at the first digit/comma/dot: group 1 is the label
+# text (what re.sub(r"[\d,\.]+.*", "") used to leave behind) and group 2 is
+# the numeric tail, so one scan replaces a sub plus a full-line findall.
+_LINE_RE = re.compile(r"([^\d,.]*)(.*)")
+_AMOUNT_RE = re.compile(r"[\d,]+\.\d{2}(?:DB|CR)?")
+_DIGIT_RE = re.compile(r"\d")
+_VALID_SECTIONS = frozenset(
+    ["INTERCHANGE", "REIMBURSEMENT", "REIMBURSEMENTFEES", "VISACHARGES", "NETSETTLEMENT", "TOTAL"]
+)
+
+# Suffix dispatch for parse_amount: one dict probe on the last two characters
+# replaces the endswith branch chain; maketrans strips commas without a scan
+# per comma
+_SIGN_SUFFIX = {"DB": 1, "CR": -1}
+_COMMA_TRANS = str.maketrans("", "", ",")
+
+def parse_amount(value: str) -> int:
+    """Convert amounts like '1,540,000.00DB' or '1,500.00CR' into signed int cents."""
     if not value or value.strip() == "":
-        return 0.0
-    value = value.replace(",", "").strip()
+        return 0
+    value = value.translate(_COMMA_TRANS).strip()
 
-    sign = 1
-    if value.endswith("DB"):
-        value = value[:-2]
+    sign = _SIGN_SUFFIX.get(value[-2:])
+    if sign is None:
         sign = 1
-    elif value.endswith("CR"):
+    else:
         value = value[:-2]
-        sign = -1
 
     try:
-        return float(value) * sign
+        return int(round(float(value) * 100)) * sign
     except ValueError:
-        return 0.0
+        return 0
+
+_TOKEN_TRANS = str.maketrans("", "", ",.")
+
+def _parse_token(token: str) -> int:
+    """Fast path for tokens that already matched _AMOUNT_RE.
+
+    The suffix is at most a trailing DB/CR pair and exactly two digits follow
+    the decimal point, so dropping the commas and the point leaves the cents
+    value verbatim - no float round trip and no defensive branches needed.
+    """
+    sign = _SIGN_SUFFIX.get(token[-2:])
+    if sign is None:
+        return int(token.translate(_TOKEN_TRANS))
+    return int(token[:-2].translate(_TOKEN_TRANS)) * sign
+
+def _parse_amount_batch(tokens):
+    """Parse a list of regex-matched amount tokens into an int64 cents array."""
+    return np.fromiter(map(_parse_token, tokens), dtype=np.int64, count=len(tokens))
 
 def extract_from_txt(file_path: str):
-    with open(file_path, "r") as f:
-        lines = f.readlines()
+    return _extract_from_txt_cached(os.fspath(file_path), _file_sig(file_path))
 
-    data = {}
-    valid_sections = ["INTERCHANGE", "REIMBURSEMENT", "REIMBURSEMENTFEES", "VISACHARGES", "NETSETTLEMENT", "TOTAL"]
+@lru_cache(maxsize=32)
+def _extract_from_txt_cached(path, sig):
+    with open(path, "r") as f:
+        return extract_from_txt_text(f.read())
+
+def extract_from_txt_text(text: str):
+    """Parse VISA settlement summary content that is already in memory."""
+    lines = text.splitlines()
+
+    # First pass gathers section names and their raw tokens so all the
+    # amounts in the file parse in a single vectorized batch afterwards
+    entries = []
+    tokens = []
 
     for line in lines:
         line = line.strip()
         if not line:
             continue
 
-        if line.upper().startswith("TOTAL") or "NET SETTLEMENT AMOUNT" in line.upper():
-            section_name = re.sub(r"[\d,\.]+.*", "", line).strip()
+        # A line without a single digit cannot yield an amount, so prose and
+        # header lines skip the label/amount scanning entirely
+        if not _DIGIT_RE.search(line):
+            continue
+
+        label_text, numeric_tail = _LINE_RE.match(line).groups()
+
+        upper_line = line.upper()
+        if upper_line.startswith("TOTAL") or "NET SETTLEMENT AMOUNT" in upper_line:
+            section_name = label_text.strip()
             section_name = section_name.replace("TOTAL", "").replace("AMOUNT", "").replace("VALUE", "").strip()
             if not section_name:
                 section_name = "TOTAL"
         else:
-            # Section name = remove numbers and keep only text
-            section_name = re.sub(r"[\d,\.]+.*", "", line).strip()
+            # Section name = the text before the numbers start
+            section_name = label_text.strip()
 
         section_name = section_name.replace(" ", "").upper()
 
-        if section_name not in valid_sections:
+        if section_name not in _VALID_SECTIONS:
             continue  # skip ACQUIRER, ISSUER, OTHER, etc.
 
-        numbers = re.findall(r"[\d,]+\.\d{2}(?:DB|CR)?", line)
+        numbers = _AMOUNT_RE.findall(numeric_tail)
         if numbers:
-            cr = parse_amount(numbers[0]) if len(numbers) > 0 else 0.0
-            dr = parse_amount(numbers[1]) if len(numbers) > 1 else 0.0
-            net = parse_amount(numbers[2]) if len(numbers) > 2 else dr - cr
+            entries.append((section_name, len(numbers)))
+            tokens.extend(numbers)
+
+    data = {}
+    if not entries:
+        return data
 
-            data[section_name] = {"CR": cr, "DR": dr, "Net": net}
+    values = _parse_amount_batch(tokens)
+    pos = 0
+    for section_name, count in entries:
+        cr = values[pos]
+        dr = values[pos + 1] if count > 1 else 0
+        net = values[pos + 2] if count > 2 else dr - cr
+        data[section_name] = {"CR": cr, "DR": dr, "Net": net}
+        pos += count
 
     return data
 
-# Normalize section names
+# Normalize section names. Keys are canonical unspaced-upper form - lookups
+# strip whitespace first, so spaced variants like "VISA CHARGES" need no
+# duplicate entry
+_SPACE_TRANS = str.maketrans("", "", " \t")
+
 SECTION_MAP = {
     "INTERCHANGE": "Interchange",
     "REIMBURSEMENT": "Reimbursement",
     "REIMBURSEMENTFEES": "Reimbursement",
-    "VISA CHARGES": "VisaCharges",
     "VISACHARGES": "VisaCharges",
     "TOTAL": "Total",
     "NETSETTLEMENT": "Total"
@@ -104,38 +235,42 @@ SECTION_MAP = {
 def normalize_sections(data):
     normalized = {}
     for section, values in data.items():
-        key = SECTION_MAP.get(section.upper().replace(" ", ""), section)
+        key = SECTION_MAP.get(section.translate(_SPACE_TRANS).upper(), section)
         normalized[key] = values
     return normalized
 
+_CHECK_FIELDS = ("DR", "CR", "Net")
+
 def reconcile(bank_data, visa_data):
     bank_data = normalize_sections(bank_data)
     visa_data = normalize_sections(visa_data)
 
-    records = []
-    sections = set(bank_data.keys()).union(set(visa_data.keys()))
-
-    for section in sections:
-        bank_vals = bank_data.get(section, {"DR": 0.0, "CR": 0.0, "Net": 0.0})
-        visa_vals = visa_data.get(section, {"DR": 0.0, "CR": 0.0, "Net": 0.0})
-
-        for field in ["DR", "CR", "Net"]:
-            bank_val = bank_vals.get(field, 0.0)
-            visa_val = visa_vals.get(field, 0.0)
-
-            status = "Match" if bank_val == visa_val else "Mismatch"
-            diff = bank_val - visa_val
+    # Key views support set ops directly - no copies of either key set
+    sections = list(bank_data.keys() | visa_data.keys())
+    empty = {}
 
-            records.append({
-                "Section": section,
-                "Check": field,
-                "Bank Statement": bank_val,
-                "Visa Summary": visa_val,
-                "Status": status,
-                "Difference": diff
-            })
+    # Lay both sides out as (sections x fields) int64 cent matrices; the
+    # status and difference columns then come from whole-array ops instead
+    # of a Python comparison per cell. Integer cents compare exactly, so
+    # the half-cent float tolerance is no longer needed here.
+    bank_cents = np.array(
+        [[bank_data.get(s, empty).get(f, 0) for f in _CHECK_FIELDS] for s in sections],
+        dtype=np.int64
+    ).ravel()
+    visa_cents = np.array(
+        [[visa_data.get(s, empty).get(f, 0) for f in _CHECK_FIELDS] for s in sections],
+        dtype=np.int64
+    ).ravel()
 
-    return pd.DataFrame(records)
+    return pd.DataFrame({
+        "Section": np.repeat(np.asarray(sections, dtype=object), len(_CHECK_FIELDS)),
+        "Check": list(_CHECK_FIELDS) * len(sections),
+        # Back to currency units for display only
+        "Bank Statement": bank_cents / 100.0,
+        "Visa Summary": visa_cents / 100.0,
+        "Status": np.where(bank_cents == visa_cents, "Match", "Mismatch"),
+        "Difference": (bank_cents - visa_cents) / 100.0
+    })
 
 if __name__ == "__main__":
     print("This module is designed to be imported and used by the web application.")